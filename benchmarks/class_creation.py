@@ -0,0 +1,61 @@
+"""
+Measures how many hookable classes can be created per second.
+
+    python benchmarks/class_creation.py [number_of_classes]
+
+Each class derives from a hookable base with a few hooks and registers handlers
+with hooks of the base in its class body, like models generated from schemas do.
+"""
+import sys
+import time
+
+from hookery import ClassHook, InstanceHook, hookable
+
+
+@hookable
+class Model:
+    before_save = InstanceHook()
+    after_save = InstanceHook()
+    validate = InstanceHook(args=('value',))
+    created = ClassHook()
+
+
+def make_model(index):
+    class GeneratedModel(Model):
+        @Model.before_save
+        def touch(self):
+            pass
+
+        @Model.validate
+        def check(self, value):
+            return value
+
+    GeneratedModel.__name__ = 'Model{}'.format(index)
+    return GeneratedModel
+
+
+def make_hookable(index):
+    class Plain:
+        changed = InstanceHook()
+
+    return hookable(Plain)
+
+
+def measure(factory, number):
+    started = time.perf_counter()
+    classes = [factory(i) for i in range(number)]
+    duration = time.perf_counter() - started
+    # Access the hooks so that they are fully initialised.
+    for cls in classes:
+        for name in ('before_save', 'validate', 'changed'):
+            getattr(cls, name, None)
+    return number / duration
+
+
+def main(number=5000):
+    for title, factory in (('subclasses with handlers', make_model), ('@hookable classes', make_hookable)):
+        print('{:<28} {:>12,.0f} classes/s'.format(title, measure(factory, number)))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
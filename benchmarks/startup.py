@@ -0,0 +1,58 @@
+"""
+Measures how long ``import hookery`` takes, in the style of ``python -X importtime``.
+
+    python benchmarks/startup.py [number_of_runs]
+
+Runs the import in fresh interpreters, after a warm-up run which writes bytecode caches,
+and reports the best total time and the modules imported because of hookery, slowest first.
+"""
+import os
+import subprocess
+import sys
+
+STATEMENT = 'import hookery'
+
+
+def import_times(statement):
+    """
+    Run ``statement`` in a fresh interpreter with ``-X importtime`` and
+    return (self_us, cumulative_us, depth, module) for modules imported by it.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env.get('PYTHONPATH'),
+    ]))
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True,
+    ).stderr
+
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+
+    # Modules are listed after the modules they import, so the modules imported by the statement
+    # are the ones listed after the last top-level module imported on interpreter startup.
+    top_level = [i for i, entry in enumerate(entries) if entry[2] == 0]
+    start = next(i for i in top_level if entries[i][3] == 'hookery')
+    previous = [i for i in top_level if i < start]
+    return entries[previous[-1] + 1 if previous else 0:start + 1]
+
+
+def main(runs=10):
+    import_times(STATEMENT)  # warm up bytecode caches
+    best = min((import_times(STATEMENT) for _ in range(runs)), key=lambda entries: entries[-1][1])
+
+    print('{}: {:.2f} ms (best of {})'.format(STATEMENT, best[-1][1] / 1000, runs))
+    print('{:>10} | {:>10} | module'.format('self [us]', 'cumulative'))
+    for self_us, cumulative_us, depth, name in sorted(best, key=lambda entry: -entry[0]):
+        print('{:>10} | {:>10} | {}{}'.format(self_us, cumulative_us, '  ' * depth, name))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
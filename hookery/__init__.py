@@ -1,15 +1,36 @@
 __version__ = '3.10.1'
 
-from .base import BoundHandler, ClassHook, Handler, Hook, Hookable, HookableMeta, HookDescriptor, InstanceHook, hookable
+from .base import (
+    BoundHandler, ClassHook, Handler, HandlerReference, Hook, Hookable, HookableMeta, HookDescriptor, InstanceHook,
+    Propagation, hookable
+)
+from .batching import Batch, deferred
+from .bubbling import ParentAttr
+from .dispatch import Dispatcher, ShardedDispatcher
+from .observable import ObservableAttr
+from .sampling import EveryNth, Probability, TokenBucket
+from .utils import Lazy
 
 __all__ = [
+    'Batch',
     'BoundHandler',
     'ClassHook',
+    'Dispatcher',
+    'EveryNth',
     'Handler',
+    'HandlerReference',
     'Hook',
     'Hookable',
     'HookableMeta',
     'HookDescriptor',
     'InstanceHook',
+    'Lazy',
+    'ObservableAttr',
+    'ParentAttr',
+    'Probability',
+    'Propagation',
+    'ShardedDispatcher',
+    'TokenBucket',
+    'deferred',
     'hookable',
 ]
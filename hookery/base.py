@@ -1,10 +1,35 @@
 import collections
-import contextlib
 import functools
-import inspect
-from typing import Generator, List, Optional
+import sys
+import threading
+import time
+import weakref
 
-from .utils import optional_args_func
+from . import batching, dispatch, recording, tracing, watchdog
+from .utils import ContextVar, Lazy, get_func_info
+
+# All hooks that are alive, see introspection.
+_live_hooks = weakref.WeakSet()
+
+# Serialises registration and unregistration of handlers in all hooks.
+# Triggering never takes this lock: handlers are stored in immutable tuples, and every
+# change publishes new tuples, so a trigger always sees a consistent snapshot.
+_registration_lock = threading.RLock()
+
+# Incremented whenever a handler is muted or unmuted, so that results memoized while
+# a different set of handlers was muted are not used.
+_mute_version = 0
+
+# Handlers added with Hook.scoped() in the current context, a dictionary of hook -> tuple of handlers.
+_scoped_handlers = ContextVar('hookery_scoped_handlers', default=None)
+
+# Bodies of hookable classes being executed in the current thread, see HookableMeta.
+_class_bodies = threading.local()
+
+# Outermost Hook.bulk() blocks of the current thread, as a dictionary of id(hook) -> _BulkChange.
+_bulk_changes = threading.local()
+
+MemoInfo = collections.namedtuple('MemoInfo', ['hits', 'misses', 'maxsize', 'currsize'])
 
 
 class Handler:
@@ -14,7 +39,7 @@ class Handler:
     See also BoundHandler.
     """
 
-    def __init__(self, func, hook):
+    def __init__(self, func, hook, latency_budget=None, sampler=None):
         if isinstance(func, classmethod):
             raise TypeError('Handler cannot be a classmethod, {} is one'.format(func))
         if isinstance(func, staticmethod):
@@ -23,6 +48,10 @@ class Handler:
             raise TypeError('{} should be a callable'.format(func))
 
         if isinstance(func, Handler):
+            if latency_budget is None:
+                latency_budget = func.latency_budget
+            if sampler is None:
+                sampler = func.sampler
             func = func._original_func
 
         if isinstance(func, functools.partial):
@@ -34,19 +63,51 @@ class Handler:
         self.name = func_name
         self.hook_name = hook.name
 
+        func_info = get_func_info(func)
+
         if hook.args:
-            func_sig = inspect.signature(func)
-            for param in func_sig.parameters:
+            for param in func_info.parameters:
                 if param in ('self', 'cls'):
                     continue
+                if param == 'call_next' and hook.around:
+                    continue
+                if param == 'propagation':
+                    continue
                 if param not in hook.args:
                     raise RuntimeError('{} is not a valid handler for {}, argument {!r} is not supported'.format(
                         func, hook, param
                     ))
 
         self._original_func = func
-        self._optional_args_func = optional_args_func(self._original_func)
-        self.is_generator = inspect.isgeneratorfunction(func)
+        self._optional_args_func = func_info.optional_args_func
+        self.parameters = func_info.parameters
+        self.is_generator = func_info.is_generator
+        self.positional = func_info.positional
+
+        # Number of seconds after which the handler is reported to the hook's watchdog as slow.
+        # Overrides the hook's latency_budget.
+        self.latency_budget = latency_budget  # type: float
+
+        # If set, the handler is only called when the sampler says so, see sampling.Sampler.
+        self.sampler = sampler
+
+        # Muted handlers are skipped when hooks are triggered.
+        self.muted = False
+
+    def mute(self):
+        """
+        Skip the handler when hooks it is registered with, or inherited by, are triggered.
+        """
+        self._set_muted(True)
+
+    def unmute(self):
+        self._set_muted(False)
+
+    def _set_muted(self, muted):
+        global _mute_version
+        with _registration_lock:
+            self.muted = muted
+            _mute_version += 1
 
     def __call__(_self_, **kwargs):
         return _self_._optional_args_func(**kwargs)
@@ -80,18 +141,86 @@ class BoundHandler(Handler):
             raise AttributeError(name)
 
     def __call__(_self_, **kwargs):
-        kwargs.setdefault('hook', _self_.hook)
+        hook = _self_.hook
+        with hook._triggering_ctx():
+            return hook._invoke_handler(_self_._handler, hook._handler_kwargs(kwargs))
 
-        if _self_.hook.is_class_associated:
-            kwargs.setdefault('cls', _self_.hook.subject)
-        elif _self_.hook.is_instance_associated:
-            kwargs.setdefault('self', _self_.hook.subject)
 
-        with _self_.hook._triggering_ctx():
-            if _self_._handler.is_generator and _self_.hook.consume_generators:
-                return list(_self_._handler(**kwargs))
-            else:
-                return _self_._handler(**kwargs)
+class HandlerReference:
+    """
+    Placeholder of handlers registered by reference -- either a ``'package.module:function'`` string
+    or a group of entry points. It is replaced with the handlers it refers to when they are first needed,
+    which is usually the first trigger of the hook.
+    Until then it counts as one handler of the hook.
+    """
+
+    def __init__(self, reference=None, entry_point_group=None, latency_budget=None, sampler=None):
+        if (reference is None) == (entry_point_group is None):
+            raise ValueError('Specify either reference or entry_point_group')
+        self.reference = reference
+        self.entry_point_group = entry_point_group
+        self.latency_budget = latency_budget
+        self.sampler = sampler
+
+        # has_handler() and unregister_handler() only match the placeholder itself.
+        self._original_func = self
+
+    @property
+    def name(self) -> str:
+        return self.reference or self.entry_point_group
+
+    def load(self) -> list:
+        """
+        Import the functions the placeholder refers to.
+        """
+        from . import loading
+
+        if self.reference is not None:
+            return [loading.import_reference(self.reference)]
+        return loading.load_entry_points(self.entry_point_group)
+
+    def __repr__(self):
+        if self.reference is not None:
+            return '{}({!r})'.format(self.__class__.__name__, self.reference)
+        return '{}(entry_point_group={!r})'.format(self.__class__.__name__, self.entry_point_group)
+
+
+class Propagation:
+    """
+    Passed as ``propagation`` to handlers of hooks whose triggers bubble up to hooks of parent objects.
+    ``hooks`` are the hooks the trigger has reached so far, starting with ``origin``, the hook that was triggered.
+    A handler can call ``stop()`` to prevent the trigger from bubbling any further,
+    handlers of the current hook are still called.
+    """
+
+    __slots__ = ('origin', 'hooks', 'stopped')
+
+    def __init__(self, origin: 'Hook'):
+        self.origin = origin
+        self.hooks = [origin]
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def __repr__(self):
+        return '<{} from {}{}>'.format(self.__class__.__name__, self.origin, ' stopped' if self.stopped else '')
+
+
+def _find_bubble_target(parent, bubble_to, name) -> 'Hook':
+    """
+    Hook of ``parent`` to which triggers of the hook ``name`` declared with ``bubble_to`` bubble up,
+    ``None`` if there is no parent.
+    """
+    if parent is None:
+        return None
+    hook_name = bubble_to.partition('.')[2] or name
+    target = getattr(parent, hook_name, None)
+    if not isinstance(target, Hook):
+        raise ValueError('{!r} has no hook {!r} for triggers of hook {!r} to bubble up to (bubble_to={!r})'.format(
+            parent, hook_name, name, bubble_to,
+        ))
+    return target
 
 
 class NoSubject:
@@ -123,6 +252,16 @@ class Hook:
         defining_class=None,
         args=None,
         consume_generators=True,
+        around=False,
+        memoize=False,
+        memoize_maxsize=128,
+        memoize_ttl=None,
+        dispatcher=None,
+        latency_budget=None,
+        watchdog=None,
+        sampler=None,
+        bubble_to=None,
+        recorder=None,
     ):
         self.name = name
         self.subject = subject if subject is not None else NoSubject()
@@ -145,45 +284,550 @@ class Hook:
         # Set consume_generators to False to disable this behaviour.
         self.consume_generators = consume_generators
 
-        self._direct_handlers = []
-        self._cached_handlers = None
-
-        self._is_triggering = False
+        # If a hook is marked as around, its handlers wrap one another like middleware.
+        # Each handler receives a ``call_next`` continuation which it may call to run the handlers
+        # registered after it, or skip to short-circuit them.
+        self.around = around  # type: bool
+
+        # If a hook is marked as memoize, trigger results are cached by values of kwargs.
+        # At most memoize_maxsize results are kept (least recently used are evicted first),
+        # each for at most memoize_ttl seconds if that is set.
+        # The cache is cleared whenever handlers of this hook or any hook it inherits handlers from change,
+        # and whenever any handler is muted or unmuted.
+        self.memoize = memoize  # type: bool
+        self.memoize_maxsize = memoize_maxsize  # type: int
+        self.memoize_ttl = memoize_ttl  # type: float
+        self._memo = None  # type: tuple
+        self._memo_lock = threading.Lock() if memoize else None
+        self._memo_hits = 0
+        self._memo_misses = 0
+
+        # Dispatcher which runs handlers in background when the hook is triggered with trigger_later().
+        # If not set, the default dispatcher is used.
+        self.dispatcher = dispatcher  # type: dispatch.Dispatcher
+
+        # Handlers which take longer than latency_budget seconds are reported to the watchdog.
+        # If watchdog is not set, the default watchdog is used which logs a warning.
+        self.latency_budget = latency_budget  # type: float
+        self.watchdog = watchdog
+
+        # If set, the hook is only triggered when the sampler says so, see sampling.Sampler.
+        # Hooks created for subclasses and instances share the sampler of the hook declared in the class.
+        self.sampler = sampler
+
+        # Name of the attribute of the subject which references its parent object, see bubbling.ParentAttr,
+        # optionally followed by a dot and the name of the parent's hook (by default the same as this hook's).
+        # Triggers of an instance-associated hook bubble up to that hook of the parent object after
+        # handlers of this hook are called, and from there further up.
+        self.bubble_to = bubble_to  # type: str
+
+        # If set, triggers of the hook are recorded by the flight recorder, see recording.FlightRecorder,
+        # in addition to the recorder that records triggers of all hooks, if that is enabled.
+        self.recorder = recorder  # type: recording.FlightRecorder
+
+        # A disabled hook returns from trigger() without calling any handlers.
+        # Hooks that inherit handlers from a disabled hook, those of subclasses and instances, are also disabled.
+        self.enabled = True
+
+        # Whether neither this hook nor any hook it inherits handlers from is disabled.
+        # Maintained by enable() and disable() so that trigger() only checks this flag.
+        self._active = True
+
+        # Handlers registered with this hook. Never modified in place, replaced on every change.
+        self._direct_handlers = ()  # type: tuple
+
+        # Whether some of the handlers registered with this hook are HandlerReference placeholders.
+        self._has_handler_references = False
+
+        # Incremented whenever handlers change in this hook or any hook it inherits handlers from.
+        self._version = 0
+
+        # (version, handlers) -- all unbound handlers of the hook as of the version.
+        self._cached_raw_handlers = None  # type: tuple
+
+        # Values derived from the unbound handlers, as (handlers, value) pairs.
+        # They are valid while the handlers tuple is the current one.
+        self._cached_needed_args = None  # type: tuple
+        self._cached_handlers = None  # type: tuple
+        self._cached_around_chain = None  # type: tuple
+        self._cached_positional_plan = None  # type: tuple
+
+        # Hooks whose handlers are inherited from this hook and whose caches
+        # must be reset when handlers of this hook change.
+        self._dependent_hooks = None  # type: weakref.WeakSet
+
+        # Number of handlers of this hook including inherited ones, maintained on every
+        # registration and unregistration anywhere up the hierarchy.
+        self._handler_count = 0
+
+        with _registration_lock:
+            for hook in (parent_class_hook, instance_class_hook):
+                if hook is not None:
+                    if hook._dependent_hooks is None:
+                        hook._dependent_hooks = weakref.WeakSet()
+                    hook._dependent_hooks.add(self)
+                    self._handler_count += hook._handler_count
+                    self._active = self._active and hook._active
+
+        # Identifiers of threads in which the hook is being triggered.
+        self._triggering_threads = set()
+
+        _live_hooks.add(self)
+
+    # Hook of the parent object to which triggers of this hook bubble up, see _update_bubble_target.
+    # Set on instances only for hooks which have a parent.
+    _bubble_target = None  # type: Hook
 
     def __call__(self, func) -> callable:
         return self.register_handler(func)
 
-    @contextlib.contextmanager
-    def _triggering_ctx(self):
+    @property
+    def _is_triggering(self) -> bool:
+        return threading.get_ident() in self._triggering_threads
+
+    def _triggering_ctx(self) -> '_TriggeringContext':
         """
         Context manager that ensures that a hook is not re-triggered by one of its handlers.
+        The same hook can be triggered in several threads at the same time.
         """
-        if self._is_triggering:
-            raise RuntimeError('{} cannot be triggered while it is being handled'.format(self))
-        self._is_triggering = True
-        try:
-            yield self
-        finally:
-            self._is_triggering = False
+        return _TriggeringContext(self)
+
+    def enable(self):
+        with _registration_lock:
+            self.enabled = True
+            self._update_active()
+
+    def disable(self):
+        """
+        Make ``trigger()`` of this hook and of hooks that inherit its handlers return immediately
+        without calling any handlers until the hook is enabled again. Handlers stay registered.
+
+        The change is pushed down to every hook that inherits handlers from this one, so the cost of ``disable()``
+        and ``enable()`` grows with the number of hooks of subclasses and instances, while ``trigger()`` only
+        checks a flag.
+        """
+        with _registration_lock:
+            self.enabled = False
+            self._update_active()
+
+    def _update_active(self):
+        """
+        Recompute whether this hook can be triggered, and if that changes, whether hooks that inherit
+        its handlers can be. Must be called with ``_registration_lock`` held.
+        """
+        active = self.enabled and all(
+            hook._active for hook in (self.parent_class_hook, self.instance_class_hook) if hook is not None
+        )
+        if active != self._active:
+            self._active = active
+            if self._dependent_hooks is not None:
+                for hook in list(self._dependent_hooks):
+                    hook._update_active()
+
+    def _skipped_result(self):
+        return None if self.single_handler or self.around else []
+
+    def trigger(_self_, *args, **kwargs):
+        if not _self_._active:
+            return _self_._skipped_result()
+
+        if args:
+            if len(args) > len(_self_.args):
+                raise TypeError('{} takes {} positional arguments but {} were given'.format(
+                    _self_, len(_self_.args), len(args)
+                ))
+            if not kwargs and len(args) == len(_self_.args):
+                return _self_.fire(*args)
+            for name, value in zip(_self_.args, args):
+                if name in kwargs:
+                    raise TypeError('{} got multiple values for argument {!r}'.format(_self_, name))
+                kwargs[name] = value
 
-    def trigger(_self_, **kwargs):
         if _self_.args:
             for k in kwargs.keys():
                 if not k.startswith('_') and k not in _self_.args:
                     raise ValueError('Unexpected keyword argument {!r} for {}'.format(k, _self_))
 
-        if _self_.single_handler:
-            if _self_.last_handler:
-                return _self_.last_handler(**kwargs)
-            else:
+        return _self_._trigger_validated(kwargs)
+
+    def _trigger_validated(self, kwargs):
+        """
+        Trigger the hook with kwargs that are known to be valid, the same way ``trigger()`` does:
+        unless the hook is disabled or its sampler skips the trigger, recorded and traced if that is enabled.
+        """
+        if not self._active or (self.sampler is not None and not self.sampler()):
+            return self._skipped_result()
+
+        if self.recorder is not None or recording.recorder is not None:
+            return self._record(tuple(kwargs), self._traced_trigger, kwargs)
+
+        return self._traced_trigger(kwargs)
+
+    def _traced_trigger(self, kwargs):
+        if tracing.tracer is not None:
+            return tracing.tracer.trace_trigger(self, kwargs)
+        return self._trigger(kwargs)
+
+    def _record(self, arg_keys, trigger, value):
+        """
+        Call ``trigger(value)`` and record it with the flight recorders of this hook and of all hooks.
+        """
+        error = None
+        started = time.perf_counter()
+        try:
+            return trigger(value)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            if self.recorder is not None:
+                self.recorder.record(self, arg_keys, duration, error)
+            if recording.recorder is not None and recording.recorder is not self.recorder:
+                recording.recorder.record(self, arg_keys, duration, error)
+
+    def fire(self, *args):
+        """
+        Trigger the hook with values of all its declared ``args``, passed positionally in the declared order.
+
+        Handlers are called with positional arguments picked from ``args`` by precomputed indices,
+        so no dictionary of kwargs is built or filtered for each handler.
+        Falls back to ``trigger()`` when that is not possible: when the hook is traced, batched, memoized,
+        an around hook, has scoped handlers or latency budgets, when some value is ``Lazy``,
+        or when some handler asks for an argument that can't be passed positionally.
+        """
+        if not self._active:
+            return self._skipped_result()
+
+        if len(args) != len(self.args):
+            raise TypeError('{} takes {} positional arguments but {} were given'.format(
+                self, len(self.args), len(args)
+            ))
+
+        if self.sampler is not None and not self.sampler():
+            return self._skipped_result()
+
+        if self.recorder is not None or recording.recorder is not None:
+            return self._record(self.args, self._fire, args)
+
+        return self._fire(args)
+
+    def _fire(self, args):
+        plan = None
+        needs_kwargs = tracing.tracer is not None or batching.open_batches or self.memoize
+        if not (needs_kwargs or self._bubble_target is not None or _scoped_handlers.get()):
+            plan = self._get_positional_plan()
+        if plan is None or any(type(v) is Lazy for v in args):
+            return self._traced_trigger(dict(zip(self.args, args)))
+
+        values = args + (self.subject,)
+
+        thread_id = threading.get_ident()
+        if thread_id in self._triggering_threads:
+            raise RuntimeError('{} cannot be triggered while it is being handled'.format(self))
+        self._triggering_threads.add(thread_id)
+        try:
+            if self.single_handler:
+                # The last handler that isn't muted is the single handler, whose sampler may skip the call.
+                for handler, func, indices, consume in reversed(plan):
+                    if not handler.muted:
+                        if handler.sampler is not None and not handler.sampler():
+                            return None
+                        result = func(*[values[i] for i in indices])
+                        return list(result) if consume else result
                 return None
 
+            results = []
+            for handler, func, indices, consume in plan:
+                if handler.muted or (handler.sampler is not None and not handler.sampler()):
+                    continue
+                result = func(*[values[i] for i in indices])
+                results.append(list(result) if consume else result)
+            return results
+        finally:
+            self._triggering_threads.discard(thread_id)
+
+    def _get_positional_plan(self) -> tuple:
+        """
+        For each handler, a tuple of (handler, function, indices, consume) where ``indices`` are positions
+        of the handler's parameters in ``args + (subject,)``, and ``consume`` tells whether the result
+        is a generator to be consumed.
+        ``None`` if some handler can't be called that way.
+        """
+        raw_handlers = self._get_raw_handlers()
+        cached = self._cached_positional_plan
+        if cached is not None and cached[0] is raw_handlers:
+            return cached[1]
+        plan = self._build_positional_plan(raw_handlers)
+        self._cached_positional_plan = (raw_handlers, plan)
+        return plan
+
+    def _build_positional_plan(self, handlers) -> tuple:
+        if self.around or self.latency_budget is not None:
+            return None
+
+        positions = {name: i for i, name in enumerate(self.args)}
+        if self.is_class_associated:
+            positions.setdefault('cls', len(self.args))
+        elif self.is_instance_associated:
+            positions.setdefault('self', len(self.args))
+
+        plan = []
+        for handler in handlers:
+            if not handler.positional or handler.latency_budget is not None:
+                return None
+            if any(param not in positions for param in handler.parameters):
+                return None
+            plan.append((
+                handler,
+                handler._original_func,
+                tuple(positions[param] for param in handler.parameters),
+                handler.is_generator and self.consume_generators,
+            ))
+        return tuple(plan)
+
+    def _trigger(self, kwargs):
+        """
+        Trigger the hook with already validated kwargs.
+        """
+        if batching.open_batches and batching.defer(self, kwargs):
+            return None
+
+        # Triggers that bubble are not memoized as each of them gets its own Propagation.
+        if self._bubble_target is not None:
+            return self._bubbling_trigger(kwargs)
+
+        if self.memoize:
+            # Results computed with scoped handlers are only valid in their context, so they are not memoized,
+            # and results memoized without them are not valid in it.
+            scoped = _scoped_handlers.get()
+            if not (scoped and self._get_scoped_handlers(scoped)):
+                return self._memoized_trigger(kwargs)
+
+        return self._trigger_handlers(kwargs)
+
+    def _bubbling_trigger(self, kwargs):
+        """
+        Call handlers of this hook and then of hooks of parent objects up the precomputed route,
+        until a handler stops the propagation. Returns results of this hook's handlers.
+        """
+        propagation = Propagation(self)
+        result = self._trigger_handlers(dict(kwargs, propagation=propagation))
+
+        target = self._bubble_target
+        while target is not None and not propagation.stopped and target not in propagation.hooks:
+            propagation.hooks.append(target)
+            if target._active and (target.sampler is None or target.sampler()):
+                tracer = tracing.tracer
+                if tracer is not None and tracer.is_recording():
+                    with tracer.span('trigger', target, name=str(target)):
+                        target._trigger_handlers(dict(kwargs, propagation=propagation))
+                else:
+                    target._trigger_handlers(dict(kwargs, propagation=propagation))
+            target = target._bubble_target
+
+        return result
+
+    def _update_bubble_target(self):
+        """
+        Find the hook to which triggers of this hook bubble up. Called when the hook is created
+        and when the subject is attached to a parent object.
+        """
+        parent = getattr(self.subject, self.bubble_to.partition('.')[0], None)
+        self._bubble_target = _find_bubble_target(parent, self.bubble_to, self.name)
+
+    def trigger_later(_self_, **kwargs):
+        """
+        Trigger the hook in the dispatcher's thread and return a future of the result of the trigger.
+        The future is cancelled if the dispatcher drops the event because its queue is full.
+        """
+        dispatcher = _self_.dispatcher or dispatch.get_default_dispatcher()
+        return dispatcher.submit(_self_, kwargs)
+
+    def batch(self, merge=None) -> batching.Batch:
+        """
+        Defer and coalesce triggers of this hook until the end of the ``with`` block.
+        While the block is open, ``trigger()`` returns ``None``.
+        See ``batching.Batch``.
+        """
+        return batching.Batch(hooks=[self], merge=merge)
+
+    def _trigger_handlers(self, kwargs):
+        scoped = _scoped_handlers.get()
+        scoped_handlers = self._get_scoped_handlers(scoped) if scoped else ()
+
+        if self.around:
+            raw_handlers = self._get_raw_handlers()
+            if scoped_handlers:
+                chain = self._build_around_chain(raw_handlers + scoped_handlers)
+            else:
+                cached = self._cached_around_chain
+                if cached is not None and cached[0] is raw_handlers:
+                    chain = cached[1]
+                else:
+                    chain = self._build_around_chain(raw_handlers)
+                    self._cached_around_chain = (raw_handlers, chain)
+            with self._triggering_ctx():
+                return chain(self._handler_kwargs(kwargs))
+
+        raw_handlers = self._get_raw_handlers()
+        if scoped_handlers:
+            raw_handlers += scoped_handlers
+        kwargs = self._handler_kwargs(kwargs)
+
+        if self.single_handler:
+            # The last handler that isn't muted is the single handler, whose sampler may skip the call.
+            for handler in reversed(raw_handlers):
+                if not handler.muted:
+                    if handler.sampler is not None and not handler.sampler():
+                        return None
+                    with self._triggering_ctx():
+                        return self._invoke_handler(handler, kwargs)
+            return None
+
         results = []
-        for handler in _self_.handlers:
-            result = handler(**kwargs)
-            results.append(result)
+        with self._triggering_ctx():
+            for handler in raw_handlers:
+                if handler.muted or (handler.sampler is not None and not handler.sampler()):
+                    continue
+                results.append(self._invoke_handler(handler, kwargs))
         return results
 
+    def _handler_kwargs(self, kwargs) -> dict:
+        """
+        Kwargs with which handlers of this hook are called: ``kwargs`` plus ``hook``, ``propagation``
+        if some handler asks for it, and ``cls`` or ``self`` if the hook is associated with a class or an instance.
+        Lazy values are evaluated only when a handler that asks for them is called, see ``optional_args_func``.
+        """
+        kwargs = dict(kwargs)
+        kwargs.setdefault('hook', self)
+        if 'propagation' not in kwargs and 'propagation' in self.needed_args:
+            # The hook is triggered directly rather than by a trigger bubbling up to it,
+            # so the propagation starts here.
+            kwargs['propagation'] = Propagation(self)
+        if self.is_class_associated:
+            kwargs.setdefault('cls', self.subject)
+        elif self.is_instance_associated:
+            kwargs.setdefault('self', self.subject)
+        return kwargs
+
+    @property
+    def needed_args(self) -> frozenset:
+        """
+        Names of arguments that at least one of the hook's handlers (including inherited ones) asks for.
+        """
+        raw_handlers = self._get_raw_handlers()
+        cached = self._cached_needed_args
+        if cached is not None and cached[0] is raw_handlers:
+            needed_args = cached[1]
+        else:
+            needed_args = frozenset(param for handler in raw_handlers for param in handler.parameters)
+            self._cached_needed_args = (raw_handlers, needed_args)
+
+        scoped = _scoped_handlers.get()
+        if scoped:
+            scoped_handlers = self._get_scoped_handlers(scoped)
+            if scoped_handlers:
+                return needed_args.union(*(h.parameters for h in scoped_handlers))
+
+        return needed_args
+
+    def _invoke_handler(self, handler: Handler, kwargs):
+        """
+        Call an unbound handler as a handler of this hook, with kwargs prepared by ``_handler_kwargs``.
+        Does not enter the hook's triggering context.
+        """
+        tracer = tracing.tracer
+        if tracer is not None and tracer.is_recording():
+            with tracer.span('handler', self, name=handler.name):
+                return self._invoke_handler_within_budget(handler, kwargs)
+        return self._invoke_handler_within_budget(handler, kwargs)
+
+    def _invoke_handler_within_budget(self, handler: Handler, kwargs):
+        budget = handler.latency_budget
+        if budget is None:
+            budget = self.latency_budget
+        if budget is None:
+            return self._invoke_handler_unmeasured(handler, kwargs)
+
+        started = time.perf_counter()
+        try:
+            return self._invoke_handler_unmeasured(handler, kwargs)
+        finally:
+            duration = time.perf_counter() - started
+            if duration > budget:
+                (self.watchdog or watchdog.default_watchdog).report(self, handler, duration, budget)
+
+    def _invoke_handler_unmeasured(self, handler: Handler, kwargs):
+        if handler.is_generator and self.consume_generators:
+            return list(handler._optional_args_func(**kwargs))
+        else:
+            return handler._optional_args_func(**kwargs)
+
+    def _memoized_trigger(self, kwargs):
+        # Lazy values are hashed by identity so results for them would never be found again,
+        # and would only push useful results out of the cache.
+        if any(type(v) is Lazy for v in kwargs.values()):
+            return self._trigger_handlers(kwargs)
+
+        try:
+            key = frozenset(kwargs.items())
+        except TypeError:
+            # Unhashable argument values, can't be memoized.
+            self._memo_misses += 1
+            return self._trigger_handlers(kwargs)
+
+        # Results are only valid for the handlers they were computed with, and the same handlers muted.
+        raw_handlers = self._get_raw_handlers()
+        mute_version = _mute_version
+
+        with self._memo_lock:
+            if self._memo is None or self._memo[0] is not raw_handlers or self._memo[2] != mute_version:
+                self._memo = (raw_handlers, collections.OrderedDict(), mute_version)
+            memo = self._memo[1]
+
+            if key in memo:
+                expires_at, result = memo[key]
+                if expires_at is None or expires_at > time.monotonic():
+                    memo.move_to_end(key)
+                    self._memo_hits += 1
+                    # Lists of results are stored as tuples, and every caller gets its own list to change.
+                    return result if self.single_handler or self.around else list(result)
+                del memo[key]
+
+            self._memo_misses += 1
+
+        result = self._trigger_handlers(kwargs)
+
+        if self.memoize_maxsize is not None and self.memoize_maxsize <= 0:
+            return result
+
+        expires_at = time.monotonic() + self.memoize_ttl if self.memoize_ttl is not None else None
+        with self._memo_lock:
+            memo[key] = (expires_at, result if self.single_handler or self.around else tuple(result))
+            if self.memoize_maxsize is not None and len(memo) > self.memoize_maxsize:
+                memo.popitem(last=False)
+        return result
+
+    def cache_info(self) -> MemoInfo:
+        """
+        Statistics of the trigger results cache of a memoize hook.
+        """
+        return MemoInfo(
+            hits=self._memo_hits,
+            misses=self._memo_misses,
+            maxsize=self.memoize_maxsize,
+            currsize=len(self._memo[1]) if self._memo is not None else 0,
+        )
+
+    def cache_clear(self):
+        """
+        Clear the trigger results cache of a memoize hook and reset its statistics.
+        """
+        self._memo = None
+        self._memo_hits = 0
+        self._memo_misses = 0
+
     @property
     def meta(self):
         """
@@ -193,35 +837,227 @@ class Hook:
         return {
             'single_handler': self.single_handler,
             'consume_generators': self.consume_generators,
+            'around': self.around,
+            'memoize': self.memoize,
+            'memoize_maxsize': self.memoize_maxsize,
+            'memoize_ttl': self.memoize_ttl,
+            'dispatcher': self.dispatcher,
+            'latency_budget': self.latency_budget,
+            'watchdog': self.watchdog,
+            'sampler': self.sampler,
+            'bubble_to': self.bubble_to,
+            'recorder': self.recorder,
         }
 
-    def get_all_handlers(self) -> Generator[Handler, None, None]:
-        def get_raw_handlers():
-            if self.parent_class_hook is not None:
-                yield from self.parent_class_hook.get_all_handlers()
-            if self.instance_class_hook is not None:
-                yield from self.instance_class_hook.get_all_handlers()
-            yield from self._direct_handlers
+    def _build_around_chain(self, handlers):
+        """
+        Compose handlers of an around hook into a single callable which takes a dictionary of kwargs.
+        The first handler is the outermost one, so handlers of parent classes wrap
+        handlers of derived classes which in turn wrap handlers of instances.
+        """
+        def end_of_chain(kwargs):
+            return None
+
+        chain = end_of_chain
+        for handler in reversed(handlers):
+            chain = self._around_link(handler, chain)
+        return chain
+
+    def _around_link(self, handler, next_link):
+        def link(kwargs):
+            if handler.muted or (handler.sampler is not None and not handler.sampler()):
+                return next_link(kwargs)
+
+            def call_next(**overrides):
+                return next_link(dict(kwargs, **overrides) if overrides else kwargs)
+            return self._invoke_handler(handler, dict(kwargs, call_next=call_next))
+        return link
+
+    def _get_raw_handlers(self) -> tuple:
+        """
+        Unbound handlers of this hook, including inherited ones.
+
+        The tuple is shared with the hook this hook inherits handlers from if this hook has no
+        handlers of its own, so hooks of classes and instances that don't register any handlers
+        cost no memory for their handlers.
+        """
+        # Read the version before the handlers so that if handlers change while they are being collected,
+        # the result is cached under the old version and is not used by the next call.
+        version = self._version
+        cached = self._cached_raw_handlers
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        if self._has_handler_references:
+            self._load_handler_references()
+            return self._get_raw_handlers()
+
+        raw_handlers = ()
+        for hook in (self.parent_class_hook, self.instance_class_hook):
+            if hook is not None:
+                inherited = hook._get_raw_handlers()
+                raw_handlers = raw_handlers + inherited if raw_handlers else inherited
+        if self._version != version:
+            # Handlers were loaded by a hook this hook inherits from.
+            return self._get_raw_handlers()
+        raw_handlers += self._direct_handlers
+        self._cached_raw_handlers = (version, raw_handlers)
+        return raw_handlers
+
+    def _load_handler_references(self):
+        """
+        Replace HandlerReference placeholders registered with this hook with the handlers they refer to.
+        If importing or validating any of them fails, all placeholders are kept and loading is retried
+        the next time handlers are needed.
+        """
+        with _registration_lock:
+            if not self._has_handler_references:
+                return
+            direct_handlers = []
+            for handler in self._direct_handlers:
+                if isinstance(handler, HandlerReference):
+                    direct_handlers.extend(
+                        Handler(func, hook=self, latency_budget=handler.latency_budget, sampler=handler.sampler)
+                        for func in handler.load()
+                    )
+                else:
+                    direct_handlers.append(handler)
+            self._publish_direct_handlers(tuple(direct_handlers))
+
+    def _publish_direct_handlers(self, direct_handlers: tuple):
+        """
+        Replace handlers registered with this hook. Must be called with ``_registration_lock`` held.
+        """
+        count_change = len(direct_handlers) - len(self._direct_handlers)
+        self._direct_handlers = direct_handlers
+        self._has_handler_references = any(isinstance(h, HandlerReference) for h in direct_handlers)
+        self._reset_handlers_cache(count_change=count_change)
+
+    def _get_scoped_handlers(self, scoped) -> tuple:
+        """
+        Handlers added with ``scoped()`` to this hook and to hooks it inherits handlers from,
+        given the dictionary of scoped handlers of the current context.
+        """
+        handlers = ()
+        for hook in (self.parent_class_hook, self.instance_class_hook):
+            if hook is not None:
+                handlers += hook._get_scoped_handlers(scoped)
+        return handlers + scoped.get(self, ())
 
-        yield from (BoundHandler(self, h) for h in get_raw_handlers())
+    def scoped(self, *handler_funcs) -> '_ScopedHandlersContext':
+        """
+        Context manager which adds handlers to this hook only for code running in the current context
+        (the current thread, or the current task of asyncio), until the end of the ``with`` block.
+        Scoped handlers are called after all other handlers. Handlers registered normally,
+        and caches derived from them, are not touched, so other contexts are not affected.
+
+            with hook.scoped(record_event) as (handler,):
+                ...
+        """
+        return _ScopedHandlersContext(self, tuple(Handler(func, hook=self) for func in handler_funcs))
+
+    def get_all_handlers(self):
+        yield from (BoundHandler(self, h) for h in self._get_raw_handlers())
+        scoped = _scoped_handlers.get()
+        if scoped:
+            yield from (BoundHandler(self, h) for h in self._get_scoped_handlers(scoped))
 
     @property
-    def handlers(self) -> List[BoundHandler]:
-        if self._cached_handlers is None:
-            self._cached_handlers = list(self.get_all_handlers())
-        return self._cached_handlers
+    def handlers(self) -> tuple:
+        scoped = _scoped_handlers.get()
+        if scoped and self._get_scoped_handlers(scoped):
+            return tuple(self.get_all_handlers())
+
+        raw_handlers = self._get_raw_handlers()
+        cached = self._cached_handlers
+        if cached is not None and cached[0] is raw_handlers:
+            return cached[1]
+        handlers = tuple(BoundHandler(self, h) for h in raw_handlers)
+        self._cached_handlers = (raw_handlers, handlers)
+        return handlers
 
     @property
-    def last_handler(self) -> Optional[BoundHandler]:
-        if self.handlers:
-            return self.handlers[-1]
+    def last_handler(self) -> BoundHandler:
+        handlers = self.handlers
+        if handlers:
+            return handlers[-1]
         else:
             return None
 
-    def register_handler(self, handler_func) -> Handler:
-        handler = Handler(handler_func, hook=self)
-        self._direct_handlers.append(handler)
+    def _reset_handlers_cache(self, count_change=0):
+        """
+        Forget everything derived from the list of handlers, in this hook
+        and in all hooks that inherit handlers from it.
+        ``count_change`` is the change in the number of handlers.
+        Must be called with ``_registration_lock`` held, after the new handlers are published.
+        """
+        self._handler_count += count_change
+        self._version += 1
+        self._cached_raw_handlers = None
+        self._cached_needed_args = None
         self._cached_handlers = None
+        self._cached_around_chain = None
+        self._cached_positional_plan = None
+        self._memo = None
+        if self._dependent_hooks is not None:
+            for hook in list(self._dependent_hooks):
+                hook._reset_handlers_cache(count_change)
+
+    def register_handler(self, handler_func, latency_budget=None, sampler=None) -> Handler:
+        """
+        Register a function as a handler of the hook.
+        ``handler_func`` may also be a ``'package.module:function'`` string in which case the function
+        is imported and validated only when handlers of the hook are first needed.
+        If ``sampler`` is set, the handler is only called on triggers the sampler picks, see ``sampling.Sampler``.
+        """
+        if isinstance(handler_func, str):
+            return self._add_handler(HandlerReference(handler_func, latency_budget=latency_budget, sampler=sampler))
+        handler = Handler(handler_func, hook=self, latency_budget=latency_budget, sampler=sampler)
+        if getattr(_class_bodies, 'stack', None) and _ClassBody.defer_registration(self, handler):
+            return handler
+        return self._add_handler(handler)
+
+    def register_entry_points(self, group, latency_budget=None) -> HandlerReference:
+        """
+        Register all entry points of the group as handlers of the hook.
+        They are loaded and validated only when handlers of the hook are first needed.
+        """
+        return self._add_handler(HandlerReference(entry_point_group=group, latency_budget=latency_budget))
+
+    def register_handlers(self, handler_funcs, latency_budget=None) -> list:
+        """
+        Register many handlers as one change, see ``bulk()``.
+        """
+        with self.bulk():
+            return [self.register_handler(func, latency_budget=latency_budget) for func in handler_funcs]
+
+    def bulk(self) -> '_BulkChange':
+        """
+        Context manager which applies all registrations and unregistrations of this hook's own handlers
+        made within the ``with`` block as one change at the end of the block, so caches of this hook and
+        of hooks that inherit its handlers are reset once, not once per handler.
+
+        Changes are not visible, even in the current thread, until the end of the block,
+        and are discarded if the block raises. Changes are staged by the thread that made them and published
+        under the lock that serialises changes of handlers only at the end of the block, so other threads
+        don't wait for the block. Handlers registered or unregistered by other threads in the meantime are kept.
+
+            with hook.bulk():
+                for plugin in plugins:
+                    hook.register_handler(plugin.handle)
+        """
+        return _BulkChange(self)
+
+    def _add_handler(self, handler):
+        bulk_change = _BulkChange.get_current(self)
+        if bulk_change is not None:
+            bulk_change.add(handler)
+            return handler
+        with _registration_lock:
+            self._direct_handlers += (handler,)
+            if isinstance(handler, HandlerReference):
+                self._has_handler_references = True
+            self._reset_handlers_cache(count_change=1)
         return handler
 
     def has_handler(self, handler_or_func) -> bool:
@@ -242,28 +1078,56 @@ class Hook:
         Remove the handler from this hook's list of handlers.
         This does not give up until the handler is found in the class hierarchy.
         """
-        index = -1
-        for i, handler in enumerate(self._direct_handlers):
-            if handler is handler_or_func or handler._original_func is handler_or_func:
-                index = i
-                break
-        if index >= 0:
-            self._direct_handlers.pop(index)
-            self._cached_handlers = None
-
-        elif self.parent_class_hook is not None and self.parent_class_hook.has_handler(handler_or_func):
-            self.parent_class_hook.unregister_handler(handler_or_func)
-            self._cached_handlers = None
+        bulk_change = _BulkChange.get_current(self)
+        with _registration_lock:
+            index = -1
+            for i, handler in enumerate(self._direct_handlers if bulk_change is None else bulk_change.handlers):
+                if handler is handler_or_func or handler._original_func is handler_or_func:
+                    index = i
+                    break
+            if index >= 0:
+                if bulk_change is not None:
+                    bulk_change.remove(index)
+                else:
+                    self._direct_handlers = self._direct_handlers[:index] + self._direct_handlers[index + 1:]
+                    self._reset_handlers_cache(count_change=-1)
+
+            elif self.parent_class_hook is not None and self.parent_class_hook.has_handler(handler_or_func):
+                self.parent_class_hook.unregister_handler(handler_or_func)
+
+            elif self.instance_class_hook is not None and self.instance_class_hook.has_handler(handler_or_func):
+                self.instance_class_hook.unregister_handler(handler_or_func)
 
-        elif self.instance_class_hook is not None and self.instance_class_hook.has_handler(handler_or_func):
-            self.instance_class_hook.unregister_handler(handler_or_func)
-            self._cached_handlers = None
+            else:
+                raise ValueError('{} is not a registered handler of {}'.format(handler_or_func, self))
 
-        else:
-            raise ValueError('{} is not a registered handler of {}'.format(handler_or_func, self))
+    @property
+    def handler_count(self) -> int:
+        """
+        Number of handlers of this hook, including inherited ones.
+        """
+        scoped = _scoped_handlers.get()
+        if scoped:
+            return self._handler_count + len(self._get_scoped_handlers(scoped))
+        return self._handler_count
 
     def __bool__(self):
-        return bool(self.handlers)
+        """
+        Whether triggering the hook would reach any handlers, including handlers of hooks its triggers bubble up to.
+        ``False`` if the hook is disabled, and handlers of disabled hooks up the route are not counted.
+        """
+        if not self._active:
+            return False
+        if self.handler_count > 0:
+            return True
+        seen = {self}
+        target = self._bubble_target
+        while target is not None and target not in seen:
+            if target._active and target.handler_count > 0:
+                return True
+            seen.add(target)
+            target = target._bubble_target
+        return False
 
     @property
     def is_class_associated(self):
@@ -282,6 +1146,121 @@ class Hook:
     __str__ = __repr__
 
 
+class _TriggeringContext:
+    """
+    See ``Hook._triggering_ctx``.
+    """
+
+    __slots__ = ('hook', 'thread_id')
+
+    def __init__(self, hook: Hook):
+        self.hook = hook
+        self.thread_id = None
+
+    def __enter__(self):
+        thread_id = threading.get_ident()
+        if thread_id in self.hook._triggering_threads:
+            raise RuntimeError('{} cannot be triggered while it is being handled'.format(self.hook))
+        self.hook._triggering_threads.add(thread_id)
+        self.thread_id = thread_id
+        return self.hook
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.hook._triggering_threads.discard(self.thread_id)
+
+
+class _ScopedHandlersContext:
+    """
+    See ``Hook.scoped``.
+    """
+
+    __slots__ = ('hook', 'handlers', '_token')
+
+    def __init__(self, hook: Hook, handlers: tuple):
+        self.hook = hook
+        self.handlers = handlers
+        self._token = None
+
+    def __enter__(self) -> tuple:
+        scoped = dict(_scoped_handlers.get() or {})
+        scoped[self.hook] = scoped.get(self.hook, ()) + self.handlers
+        self._token = _scoped_handlers.set(scoped)
+        return self.handlers
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _scoped_handlers.reset(self._token)
+
+
+class _BulkChange:
+    """
+    See ``Hook.bulk``.
+
+    The outermost block of a thread stages changes in ``handlers``, a copy of the hook's handlers as of
+    the start of the block (``base``), and also records them in ``changes`` as (added, handler) pairs
+    so that they can be replayed on the hook's handlers if another thread changed them in the meantime.
+    """
+
+    __slots__ = ('hook', 'outermost', 'base', 'handlers', 'changes')
+
+    def __init__(self, hook: Hook):
+        self.hook = hook
+        self.outermost = False
+        self.base = None  # type: tuple
+        self.handlers = None  # type: list
+        self.changes = None  # type: list
+
+    @staticmethod
+    def get_current(hook: Hook) -> '_BulkChange':
+        """
+        The outermost bulk change of the hook in the current thread, or ``None``.
+        """
+        staged = getattr(_bulk_changes, 'staged', None)
+        if staged:
+            return staged.get(id(hook))
+        return None
+
+    def add(self, handler):
+        self.handlers.append(handler)
+        self.changes.append((True, handler))
+
+    def remove(self, index):
+        self.changes.append((False, self.handlers.pop(index)))
+
+    def __enter__(self) -> Hook:
+        hook = self.hook
+        staged = getattr(_bulk_changes, 'staged', None)
+        if staged is None:
+            staged = _bulk_changes.staged = {}
+        if id(hook) not in staged:
+            self.base = hook._direct_handlers
+            self.handlers = list(self.base)
+            self.changes = []
+            staged[id(hook)] = self
+            self.outermost = True
+        return hook
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self.outermost:
+            return
+        hook = self.hook
+        del _bulk_changes.staged[id(hook)]
+        if exc_type is not None or not self.changes:
+            return
+
+        with _registration_lock:
+            if hook._direct_handlers is self.base:
+                handlers = self.handlers
+            else:
+                handlers = list(hook._direct_handlers)
+                for added, handler in self.changes:
+                    if added:
+                        handlers.append(handler)
+                    else:
+                        handlers = [h for h in handlers if h is not handler]
+            if handlers != list(hook._direct_handlers):
+                hook._publish_direct_handlers(tuple(handlers))
+
+
 class HookDescriptor:
     def __init__(self, defining_hook: Hook, defining_class: type):
         self.defining_hook = defining_hook
@@ -289,6 +1268,11 @@ class HookDescriptor:
         # the class which defined the hook
         self.defining_class = defining_class
 
+        # Names of attributes in which the class-associated hook is stored in ``__dict__`` of each class
+        # and the instance-associated hook is stored in ``__dict__`` of each instance.
+        self.class_hook_attr_name = '_class_hook#{}'.format(self.name)
+        self.instance_hook_attr_name = '_instance_hook#{}'.format(self.name)
+
     @property
     def name(self):
         return self.defining_hook.name
@@ -300,28 +1284,33 @@ class HookDescriptor:
     def __get__(self, instance, owner):
         has_class_as_subject = instance is None
         if has_class_as_subject:
-            attr_name = '_class_{}_hook#{}'.format(owner.__name__, self.name)
-            if not hasattr(owner, attr_name):
+            # Look in the class's own __dict__ so that hooks of parent classes aren't picked up.
+            hook = owner.__dict__.get(self.class_hook_attr_name)
+            if hook is None:
                 parent_class_hook = getattr(owner.__bases__[0], self.name, None)
                 if parent_class_hook is not None and parent_class_hook.defining_class != self.defining_class:
                     # Do not link to parent_class_hook if it is actually
                     # a different hook (this hook is an overwrite of it).
                     parent_class_hook = None
-                setattr(owner, attr_name, self.create_hook(
+                hook = self.create_hook(
                     subject=owner,
                     parent_class_hook=parent_class_hook,
                     **self.defining_hook.meta
-                ))
-            return getattr(owner, attr_name)
+                )
+                setattr(owner, self.class_hook_attr_name, hook)
+            return hook
         else:
-            attr_name = '_instance_hook#{}'.format(self.name)
-            if not hasattr(instance, attr_name):
-                setattr(instance, attr_name, self.create_hook(
+            hook = instance.__dict__.get(self.instance_hook_attr_name)
+            if hook is None:
+                hook = self.create_hook(
                     subject=instance,
                     instance_class_hook=getattr(owner, self.name),
                     **self.defining_hook.meta
-                ))
-            return getattr(instance, attr_name)
+                )
+                setattr(instance, self.instance_hook_attr_name, hook)
+                if hook.bubble_to is not None:
+                    hook._update_bubble_target()
+            return hook
 
     def create_hook(_self_, **kwargs):
         kwargs.setdefault('name', _self_.name)
@@ -333,9 +1322,11 @@ class HookDescriptor:
         # copy the handlers from the defining hook -- if handlers are registered
         # right next to the hook declaration in a class body then these handlers
         # would otherwise be lost because of the Hook -> HookDescriptor -> Hook overwrite.
-        if hook.is_class_associated:
+        # Hooks of derived classes inherit these handlers through their parent_class_hook.
+        # The same handler objects are registered so that muting a handler which is a class attribute works.
+        if hook.is_class_associated and hook.parent_class_hook is None:
             for handler in _self_.defining_hook._direct_handlers:
-                hook.register_handler(handler._original_func)
+                hook._add_handler(handler)
 
         return hook
 
@@ -354,15 +1345,25 @@ class ClassHook(Hook):
     to as a namespace. When you create a new class with a hookable class as its base class, the new class
     will inherit all the handlers registered with hooks of the parent class.
     """
-    def trigger(_self_, **kwargs):
+    def trigger(_self_, *args, **kwargs):
         if not _self_.is_class_associated:
             raise TypeError('Incorrect usage of {}'.format(_self_))
-        return super().trigger(**kwargs)
+        return super().trigger(*args, **kwargs)
+
+    def fire(self, *args):
+        if not self.is_class_associated:
+            raise TypeError('Incorrect usage of {}'.format(self))
+        return super().fire(*args)
 
-    def register_handler(self, handler_func):
+    def register_handler(self, handler_func, latency_budget=None, sampler=None):
         if self.is_instance_associated:
             raise TypeError('Incorrect usage of {}'.format(self))
-        return super().register_handler(handler_func)
+        return super().register_handler(handler_func, latency_budget=latency_budget, sampler=sampler)
+
+    def register_entry_points(self, group, latency_budget=None):
+        if self.is_instance_associated:
+            raise TypeError('Incorrect usage of {}'.format(self))
+        return super().register_entry_points(group, latency_budget=latency_budget)
 
 
 class InstanceHook(Hook):
@@ -377,67 +1378,191 @@ class InstanceHook(Hook):
     called first and then all handlers for the instance-associated hook will be called.
     """
 
-    def trigger(_self_, **kwargs):
-        if not _self_.defining_class:
+    def trigger(_self_, *args, **kwargs):
+        _self_._check_triggerable()
+        return super().trigger(*args, **kwargs)
+
+    def fire(self, *args):
+        self._check_triggerable()
+        return super().fire(*args)
+
+    def _check_triggerable(self):
+        if not self.defining_class:
             raise RuntimeError((
                 'Did you forget to decorate your hookable class? {} is not initialised properly.'
-            ).format(_self_))
+            ).format(self))
 
-        if not _self_.is_instance_associated:
-            raise TypeError('Incorrect usage of {}'.format(_self_))
+        if not self.is_instance_associated:
+            raise TypeError('Incorrect usage of {}'.format(self))
+
+
+class _ClassBody:
+    """
+    Body of a class derived from a hookable class, being executed.
+
+    [H001]
+    Handlers registered in the body with hooks of parent classes are meant for hooks of the class being created,
+    which don't exist yet. Instead of registering them with parent class hooks and moving them once
+    the class is created, their registration is deferred until the class is created, so parent class hooks
+    and hooks that inherit their handlers don't see them at all.
+    """
+
+    # Bodies are identified by ids of their namespace and of the frame executing the class statement,
+    # and by the code and the current instruction of that frame, rather than by references to them,
+    # because a body that raises is never popped and must not keep the frame and its locals alive.
+    # Once the frame moves past the class statement, the body is known to have raised.
+    __slots__ = ('namespace_id', 'hookable_parent', 'outer_frame_id', 'outer_code', 'outer_lasti', 'pending')
+
+    def __init__(self, namespace, hookable_parent, outer_frame):
+        self.namespace_id = id(namespace)
+        self.hookable_parent = hookable_parent
+
+        # Frame which executes the class statement, the class body is executed in a frame called from it.
+        self.outer_frame_id = id(outer_frame)
+        self.outer_code = outer_frame.f_code
+        self.outer_lasti = outer_frame.f_lasti
+
+        # (hook, handler) pairs of registrations deferred until the class is created.
+        self.pending = []
+
+    def is_outer_frame(self, frame) -> bool:
+        """
+        Whether ``frame`` is the frame executing the class statement of this body, still at the class statement.
+        """
+        if frame is None or id(frame) != self.outer_frame_id:
+            return False
+        return frame.f_code is self.outer_code and frame.f_lasti == self.outer_lasti
+
+    @classmethod
+    def push(cls, namespace, hookable_parent, outer_frame):
+        stack = getattr(_class_bodies, 'stack', None)
+        if stack is None:
+            stack = _class_bodies.stack = []
+        elif stack:
+            # Drop bodies which raised: the frames that executed their class statements are gone
+            # or have moved on.
+            frames = []
+            frame = outer_frame
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            stack[:] = [body for body in stack if any(body.is_outer_frame(f) for f in frames)]
+        stack.append(cls(namespace, hookable_parent, outer_frame))
 
-        return super().trigger(**kwargs)
+    @classmethod
+    def pop(cls, namespace) -> '_ClassBody':
+        """
+        Remove the class body executed with ``namespace`` from the stack, together with
+        bodies pushed after it which must have failed.
+        """
+        stack = getattr(_class_bodies, 'stack', None)
+        if stack:
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i].namespace_id == id(namespace):
+                    body = stack[i]
+                    del stack[i:]
+                    return body
+        return None
+
+    @classmethod
+    def defer_registration(cls, hook: Hook, handler: Handler) -> bool:
+        """
+        Defer registration of the handler with the hook if it happens directly in the body of the class
+        that is being created, and the hook is a class-associated hook of its hookable parent
+        or a hook from which that inherits handlers.
+        """
+        body = _class_bodies.stack[-1]
+        if not hook.is_class_associated or not issubclass(body.hookable_parent, hook.subject):
+            return False
+
+        parent_hook = getattr(body.hookable_parent, hook.name, None)
+        while isinstance(parent_hook, Hook) and parent_hook is not hook:
+            parent_hook = parent_hook.parent_class_hook
+        if parent_hook is not hook:
+            return False
+
+        frame = sys._getframe(1)
+        while frame is not None and not body.is_outer_frame(frame.f_back):
+            frame = frame.f_back
+        if frame is None:
+            # The class statement is not being executed any more, its body must have raised.
+            _class_bodies.stack.pop()
+            return False
+        if id(frame.f_locals) != body.namespace_id:
+            return False
+
+        body.pending.append((hook, handler))
+        return True
 
 
 class HookableMeta(type):
     @classmethod
     def __prepare__(meta, name, bases):
         # If you register multiple attributes of a class as handlers of the same hook within the same class body then
-        # their order must be preserved.
-        # This method is required only for Python 3.5.
-        return collections.OrderedDict()
+        # their order must be preserved. Plain dictionaries preserve order since Python 3.6.
+        namespace = {} if sys.version_info >= (3, 6) else collections.OrderedDict()
+
+        hookable_parent = None
+        for base in bases:
+            if issubclass(base, Hookable):
+                hookable_parent = base
+        if hookable_parent is not None:
+            _ClassBody.push(namespace, hookable_parent, sys._getframe(1))
+
+        return namespace
 
     def __new__(meta, name, bases, dct):
+        body = _ClassBody.pop(dct)
+        pending = body.pending if body is not None else ()
+        deferred_handlers = {id(handler) for hook, handler in pending}
 
-        for parent in bases:
-            for k, v in dct.items():
-                if isinstance(v, Handler) and isinstance(getattr(parent, k, None), Hook):
-                    raise RuntimeError('{}.{} (handler) overwrites hook with the same name'.format(name, k))
+        # Original functions of handlers which are attributes of the class.
+        own_funcs = set()
 
-        # [H001]
-        # Find handlers registered in the class against parent class's hooks.
-        # We interpret it as attempt to register handlers for current class hook not for parent class hook.
-        hookable_parent = None
+        # Handlers registered with parent class hooks when the class wasn't created with a class statement.
         handlers_registered_with_parent_class_hook = []
+
+        hookable_parent = None
         for base in bases:
             if issubclass(base, Hookable):
                 hookable_parent = base
-        if hookable_parent is not None:
-            for k, v in list(dct.items()):
-                if isinstance(v, Handler):
-                    if not v.hook_name:
-                        # [H002]
-                        # Ignore the handlers that are registered against just-declared hooks who
-                        # don't have name set yet.
-                        continue
+
+        for k, v in list(dct.items()):
+            if isinstance(v, Handler):
+                for parent in bases:
+                    if isinstance(getattr(parent, k, None), Hook):
+                        raise RuntimeError('{}.{} (handler) overwrites hook with the same name'.format(name, k))
+
+                own_funcs.add(id(v._original_func))
+
+                # [H002]
+                # Ignore the handlers that are registered against just-declared hooks who
+                # don't have name set yet.
+                if hookable_parent is not None and v.hook_name and id(v) not in deferred_handlers:
                     parent_hook = getattr(hookable_parent, v.hook_name, None)  # type: Hook
                     if parent_hook is not None and parent_hook.has_handler(v):
                         parent_hook.unregister_handler(v)
-                        handlers_registered_with_parent_class_hook.append((v.hook_name, v._original_func))
+                        handlers_registered_with_parent_class_hook.append((v.hook_name, v))
 
-        hook_definitions = []
-
-        for k, v in list(dct.items()):
-            if isinstance(v, (ClassHook, InstanceHook)):
-                dct.pop(k)
+            elif isinstance(v, (ClassHook, InstanceHook)):
                 if v.name is None:
                     v.name = k
-                hook_definitions.append((k, v))
+                dct[k] = HookDescriptor(defining_hook=v, defining_class=None)
 
         cls = super().__new__(meta, name, bases, dct)
 
-        for k, v in hook_definitions:
-            setattr(cls, k, HookDescriptor(defining_hook=v, defining_class=cls))
+        for v in dct.values():
+            if isinstance(v, HookDescriptor) and v.defining_class is None:
+                v.defining_class = cls
+
+        # [H001]
+        # Handlers registered in the class body with parent class hooks are registered with this class's hooks.
+        # That includes handlers stacked under them, which are not attributes of the class themselves.
+        for hook, handler in pending:
+            if id(handler._original_func) in own_funcs:
+                getattr(cls, hook.name)._add_handler(handler)
+            else:
+                hook._add_handler(handler)
 
         for k, v in handlers_registered_with_parent_class_hook:
             getattr(cls, k)(v)
@@ -446,7 +1571,8 @@ class HookableMeta(type):
 
 
 class Hookable(metaclass=HookableMeta):
-    pass
+    # Don't add __dict__ to instances of hookable classes which declare __slots__.
+    __slots__ = ()
 
 
 def hookable(cls):
@@ -469,19 +1595,17 @@ def hookable(cls):
     """
     assert isinstance(cls, type)
 
-    # For classes that won't have descriptors initialised by metaclass, need to do it here.
-    hook_definitions = []
-    if not issubclass(cls, Hookable):
-        for k, v in list(cls.__dict__.items()):
-            if isinstance(v, (ClassHook, InstanceHook)):
-                delattr(cls, k)
-                if v.name is None:
-                    v.name = k
-                hook_definitions.append((k, v))
-
-    hookable_cls = type(cls.__name__, (cls, Hookable), {})
-
-    for k, v in hook_definitions:
-        setattr(hookable_cls, k, HookDescriptor(defining_hook=v, defining_class=hookable_cls))
+    # Hook descriptors of hookable classes are already initialised by metaclass.
+    if issubclass(cls, Hookable):
+        return cls
 
-    return hookable_cls
+    # For classes that won't have descriptors initialised by metaclass, need to do it here.
+    dct = {'__slots__': ()}
+    for k, v in list(cls.__dict__.items()):
+        if isinstance(v, (ClassHook, InstanceHook)):
+            delattr(cls, k)
+            if v.name is None:
+                v.name = k
+            dct[k] = HookDescriptor(defining_hook=v, defining_class=None)
+
+    return type(cls.__name__, (cls, Hookable), dct)
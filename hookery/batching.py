@@ -0,0 +1,97 @@
+import collections
+import threading
+
+# Number of batches open in all threads, so that triggering
+# outside of any batch only pays for checking this number.
+open_batches = 0
+
+_open_batches_lock = threading.Lock()
+_local = threading.local()
+
+
+def merge_kwargs(old_kwargs, new_kwargs):
+    """
+    Default merge of kwargs of two coalesced triggers of the same hook: later values win.
+    """
+    merged = dict(old_kwargs)
+    merged.update(new_kwargs)
+    return merged
+
+
+class Batch:
+    """
+    Context manager which, while open, records triggers of hooks instead of calling their handlers,
+    coalesces triggers of the same hook into one, and triggers each recorded hook once when the block exits.
+
+    If ``hooks`` is given, only triggers of these hooks are recorded, otherwise triggers of all hooks are.
+    ``merge`` is called with kwargs of the recorded trigger and kwargs of the new trigger of the same hook,
+    and returns the kwargs to record instead. By default, later values win.
+
+    Batches are thread-local. Recorded triggers are discarded if the block raises an exception.
+    """
+
+    def __init__(self, hooks=None, merge=None):
+        self.hooks = hooks
+        self.merge = merge or merge_kwargs
+        self._recorded = collections.OrderedDict()
+
+    def accepts(self, hook) -> bool:
+        return self.hooks is None or any(h is hook for h in self.hooks)
+
+    def record(self, hook, kwargs):
+        # Triggers of a class hook on behalf of different instances, see ObservableAttr, are not coalesced.
+        key = (id(hook), id(kwargs.get('self')))
+        if key in self._recorded:
+            kwargs = self.merge(self._recorded[key][1], kwargs)
+        self._recorded[key] = (hook, kwargs)
+
+    def flush(self):
+        """
+        Trigger all recorded hooks in the order they were first triggered.
+        """
+        recorded, self._recorded = self._recorded, collections.OrderedDict()
+        for hook, kwargs in recorded.values():
+            # Kwargs were validated when the hook was triggered.
+            hook._trigger_validated(kwargs)
+
+    def __enter__(self):
+        global open_batches
+        if not hasattr(_local, 'batches'):
+            _local.batches = []
+        _local.batches.append(self)
+        with _open_batches_lock:
+            open_batches += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global open_batches
+        _local.batches.remove(self)
+        with _open_batches_lock:
+            open_batches -= 1
+        if exc_type is None:
+            self.flush()
+        else:
+            self._recorded.clear()
+
+
+def defer(hook, kwargs) -> bool:
+    """
+    Record the trigger in the innermost batch of the current thread that accepts the hook.
+    Returns ``True`` if the trigger was recorded and the handlers must not be called now.
+    """
+    for batch in reversed(getattr(_local, 'batches', ())):
+        if batch.accepts(hook):
+            batch.record(hook, kwargs)
+            return True
+    return False
+
+
+def deferred(merge=None) -> Batch:
+    """
+    Defer and coalesce triggers of all hooks until the end of the ``with`` block.
+
+        with hookery.deferred():
+            address.city = 'Riga'
+            address.country = 'Latvia'
+    """
+    return Batch(merge=merge)
@@ -0,0 +1,294 @@
+import collections
+import pickle
+import queue
+import select
+import struct
+import threading
+import time
+
+from . import watchdog
+
+
+class PipeTransport:
+    """
+    Transport over one end of a duplex ``multiprocessing.Pipe()``.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def send(self, data: bytes):
+        self.connection.send_bytes(data)
+
+    def recv(self, timeout=0):
+        try:
+            if self.connection.poll(timeout):
+                return self.connection.recv_bytes()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def close(self):
+        self.connection.close()
+
+
+class QueueTransport:
+    """
+    Transport over a pair of ``multiprocessing.Queue`` objects, one for each direction.
+    """
+
+    def __init__(self, outbox, inbox):
+        self.outbox = outbox
+        self.inbox = inbox
+
+    def send(self, data: bytes):
+        self.outbox.put(data)
+
+    def recv(self, timeout=0):
+        try:
+            if timeout:
+                return self.inbox.get(timeout=timeout)
+            else:
+                return self.inbox.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.outbox.close()
+
+
+class SocketTransport:
+    """
+    Transport over a connected stream socket, for example one end of ``socket.socketpair()``
+    or a Unix domain socket. Messages are prefixed with their length.
+    """
+
+    _header = struct.Struct('!I')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._buffer = b''
+
+    def send(self, data: bytes):
+        self.sock.sendall(self._header.pack(len(data)) + data)
+
+    def _read_buffered(self, size, timeout):
+        deadline = time.monotonic() + timeout if timeout else None
+        while len(self._buffer) < size:
+            remaining = max(0, deadline - time.monotonic()) if deadline is not None else 0
+            readable, _, _ = select.select([self.sock], [], [], remaining)
+            if not readable:
+                return False
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                return False
+            self._buffer += chunk
+        return True
+
+    def recv(self, timeout=0):
+        if not self._read_buffered(self._header.size, timeout):
+            return None
+        size, = self._header.unpack(self._buffer[:self._header.size])
+        if not self._read_buffered(self._header.size + size, timeout):
+            return None
+        data = self._buffer[self._header.size:self._header.size + size]
+        self._buffer = self._buffer[self._header.size + size:]
+        return data
+
+    def close(self):
+        self.sock.close()
+
+
+class Broadcaster:
+    """
+    Sends triggers of registered hooks to peer processes and replays triggers received from them.
+
+    Each process creates a broadcaster with transports connecting it to its peers and registers its local hooks
+    under names that are the same in all processes. Transports must be created before worker processes are forked:
+
+        parent_end, child_end = multiprocessing.Pipe()
+        if os.fork() == 0:
+            broadcaster = Broadcaster(peers=[PipeTransport(child_end)])
+        else:
+            broadcaster = Broadcaster(peers=[PipeTransport(parent_end)])
+        broadcaster.register('invalidate_cache', invalidate_cache)
+        broadcaster.start_listener()
+
+    ``broadcaster.trigger(name, **kwargs)`` triggers the local hook and sends the trigger to peers,
+    ``broadcaster.poll()``, or the thread started by ``broadcaster.start_listener()``, replays triggers
+    received from peers on local hooks.
+
+    Sending doesn't block the caller: kwargs are pickled in the caller's thread, but writing to transports
+    happens in a background thread which sends up to ``batch_size`` triggers in one message,
+    waiting at most ``flush_interval`` seconds for a batch to fill up.
+    A peer whose transport fails to send or receive is logged to the ``hookery`` logger and moved from ``peers``
+    to ``failed_peers``, so that other peers keep receiving triggers. A received trigger whose handlers raise
+    is logged and doesn't stop the rest of the batch from being replayed.
+    """
+
+    def __init__(self, peers=(), batch_size=100, flush_interval=0.005):
+        # Replaced rather than changed in place, so that poll() can iterate over it while the sender drops a peer.
+        self.peers = list(peers)
+        self.failed_peers = []
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.hooks = {}
+
+        self._outbox = collections.deque()
+        self._condition = threading.Condition()
+        self._unsent = 0
+        self._flushing = 0
+        self._closed = False
+        self._sender = None  # type: threading.Thread
+        self._listener = None  # type: threading.Thread
+
+    def register(self, name, hook):
+        """
+        Register a local hook under a name by which peers refer to it.
+        """
+        self.hooks[name] = hook
+        return hook
+
+    def trigger(_self_, _name_, **kwargs):
+        """
+        Trigger the local hook registered under the name and send the trigger to peers.
+        """
+        result = _self_.hooks[_name_].trigger(**kwargs)
+        _self_.send(_name_, kwargs)
+        return result
+
+    def send(self, name, kwargs):
+        """
+        Queue a trigger of the hook registered under the name to be sent to peers, without triggering it locally.
+        """
+        if name not in self.hooks:
+            raise KeyError('No hook registered under name {!r}'.format(name))
+        message = pickle.dumps((name, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('{} is closed'.format(self))
+            self._outbox.append(message)
+            self._unsent += 1
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._run_sender, name='hookery-broadcast-sender', daemon=True)
+                self._sender.start()
+            self._condition.notify_all()
+
+    def _run_sender(self):
+        while True:
+            with self._condition:
+                while not self._outbox and not self._closed:
+                    self._condition.wait()
+                if not self._outbox:
+                    return
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._outbox) < self.batch_size and not self._closed and not self._flushing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = [self._outbox.popleft() for _ in range(min(self.batch_size, len(self._outbox)))]
+
+            try:
+                data = pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL)
+                for peer in self.peers:
+                    try:
+                        peer.send(data)
+                    except Exception:
+                        self._drop_peer(peer, 'send')
+            finally:
+                with self._condition:
+                    self._unsent -= len(batch)
+                    self._condition.notify_all()
+
+    def _drop_peer(self, peer, action):
+        watchdog.get_logger().warning('Dropping peer %r of %r which failed to %s', peer, self, action, exc_info=True)
+        with self._condition:
+            if peer in self.peers:
+                self.peers = [p for p in self.peers if p is not peer]
+                self.failed_peers.append(peer)
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Wait until all queued triggers are sent to peers.
+        Returns ``False`` if that didn't happen within ``timeout`` seconds.
+        """
+        with self._condition:
+            # Don't let the sender wait for the current batch to fill up.
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(lambda: self._unsent == 0, timeout=timeout)
+            finally:
+                self._flushing -= 1
+
+    def poll(self, timeout=0) -> int:
+        """
+        Replay on local hooks the triggers received from peers.
+        Waits at most ``timeout`` seconds for a message from each peer.
+        Returns the number of replayed triggers.
+
+        A message that fails to unpickle or to replay is logged to the ``hookery`` logger and skipped,
+        and a peer whose transport fails to receive is dropped like one that fails to send.
+        """
+        replayed = 0
+        for peer in self.peers:
+            try:
+                data = peer.recv(timeout)
+                while data is not None:
+                    replayed += self._replay(peer, data)
+                    data = peer.recv(0)
+            except Exception:
+                self._drop_peer(peer, 'receive')
+        return replayed
+
+    def _replay(self, peer, data) -> int:
+        try:
+            messages = pickle.loads(data)
+        except Exception:
+            watchdog.get_logger().warning('Skipping batch from peer %r of %r which failed to unpickle', peer, self,
+                                          exc_info=True)
+            return 0
+
+        replayed = 0
+        for message in messages:
+            try:
+                name, kwargs = pickle.loads(message)
+                hook = self.hooks.get(name)
+                if hook is not None:
+                    hook.trigger(**kwargs)
+                    replayed += 1
+            except Exception:
+                watchdog.get_logger().warning('Failed to replay trigger from peer %r of %r', peer, self, exc_info=True)
+        return replayed
+
+    def start_listener(self, interval=0.05):
+        """
+        Start a thread which replays triggers received from peers as they arrive.
+        """
+        if self._listener is not None:
+            return
+
+        def listen():
+            while not self._closed:
+                self.poll(timeout=interval)
+
+        self._listener = threading.Thread(target=listen, name='hookery-broadcast-listener', daemon=True)
+        self._listener.start()
+
+    def close(self, timeout=None):
+        """
+        Send all queued triggers, stop background threads and close transports.
+        """
+        self.flush(timeout=timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in (self._sender, self._listener):
+            if thread is not None:
+                thread.join(timeout=timeout)
+        for peer in self.peers + self.failed_peers:
+            peer.close()
+
+    def __repr__(self):
+        return '<{} {}>'.format(self.__class__.__name__, sorted(self.hooks))
@@ -0,0 +1,78 @@
+import weakref
+
+from .base import HookDescriptor, _find_bubble_target
+
+
+class ParentAttr:
+    """
+    Attribute which references the parent object of an object, for example the document which contains a field.
+    Triggers of instance hooks declared with ``bubble_to`` set to the name of the attribute bubble up
+    to the hook with the same name of the parent object, and from there further up:
+
+        @hookable
+        class Document:
+            changed = InstanceHook(args=('value',))
+
+        @hookable
+        class Field:
+            document = ParentAttr()
+            changed = InstanceHook(args=('value',), bubble_to='document')
+
+    To bubble up to a hook with a different name, pass ``bubble_to='document.field_changed'``.
+
+    The route is worked out when a parent is assigned to the attribute, or when the hook of an object
+    that already has a parent is created, so triggers don't look it up.
+    Assigning a parent which doesn't have the hook to bubble up to raises ``ValueError``.
+    Handlers can ask for ``propagation`` argument and call ``propagation.stop()`` to stop the trigger
+    from bubbling any further.
+    """
+
+    def __init__(self):
+        self.name = None
+
+        # Class -> descriptors of hooks of the class which bubble up through this attribute.
+        self._bubbling_hooks = weakref.WeakKeyDictionary()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__.get(self.name)
+
+    def __set__(self, instance, value):
+        # Find all targets before storing the parent, so that an unsuitable parent is not attached.
+        targets = []
+        for descriptor in self._get_bubbling_hooks(type(instance)):
+            target = _find_bubble_target(value, descriptor.defining_hook.bubble_to, descriptor.name)
+            hook = instance.__dict__.get(descriptor.instance_hook_attr_name)
+            if hook is not None:
+                targets.append((hook, target))
+
+        instance.__dict__[self.name] = value
+        for hook, target in targets:
+            hook._bubble_target = target
+
+    def __delete__(self, instance):
+        self.__set__(instance, None)
+        del instance.__dict__[self.name]
+
+    def _get_bubbling_hooks(self, owner) -> list:
+        descriptors = self._bubbling_hooks.get(owner)
+        if descriptors is None:
+            descriptors = []
+            names = set()
+            for cls in owner.__mro__:
+                for k, v in vars(cls).items():
+                    if not isinstance(v, HookDescriptor) or k in names:
+                        continue
+                    names.add(k)
+                    bubble_to = v.defining_hook.bubble_to
+                    if bubble_to is not None and bubble_to.partition('.')[0] == self.name:
+                        descriptors.append(v)
+            self._bubbling_hooks[owner] = descriptors
+        return descriptors
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(self.__class__.__name__, self.name)
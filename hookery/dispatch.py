@@ -0,0 +1,274 @@
+import collections
+import threading
+import time
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+_Event = collections.namedtuple('_Event', ['hook', 'kwargs', 'future', 'enqueued_at'])
+
+ShardStats = collections.namedtuple('ShardStats', ['depth', 'lag', 'processed'])
+
+
+def _deadline(timeout):
+    return time.monotonic() + timeout if timeout is not None else None
+
+
+def _remaining(deadline):
+    return max(0.0, deadline - time.monotonic()) if deadline is not None else None
+
+
+class _Worker:
+    """
+    Thread which triggers hooks from its own bounded queue, in the order they were put in the queue.
+    The thread is started on the first ``put``.
+    """
+
+    def __init__(self, maxsize, overflow, name):
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.name = name
+
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._unfinished = 0
+        self._processed = 0
+        self._closed = False
+        self._thread = None  # type: threading.Thread
+
+    def put(self, event: _Event):
+        dropped = None
+        inline = False
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('{} is closed'.format(self.name))
+
+            if self.maxsize and len(self._queue) >= self.maxsize:
+                if self.overflow == DROP_NEWEST:
+                    event.future.cancel()
+                    return
+                elif self.overflow == DROP_OLDEST:
+                    dropped = self._queue.popleft()
+                    self._unfinished -= 1
+                elif self._thread is not None and self._thread.ident == threading.get_ident():
+                    # A handler run by this worker submitted an event while the queue is full. Waiting would
+                    # deadlock because only this thread makes space in the queue, so the event is processed now.
+                    self._unfinished += 1
+                    inline = True
+                else:
+                    while len(self._queue) >= self.maxsize and not self._closed:
+                        self._condition.wait()
+                    if self._closed:
+                        raise RuntimeError('{} is closed'.format(self.name))
+
+            if not inline:
+                self._queue.append(event)
+                self._unfinished += 1
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+                self._condition.notify_all()
+
+        if dropped is not None:
+            dropped.future.cancel()
+        if inline:
+            self._finish(event)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                event = self._queue.popleft()
+                self._condition.notify_all()
+
+            self._finish(event)
+
+    def _finish(self, event: _Event):
+        try:
+            self._process(event)
+        finally:
+            with self._condition:
+                self._unfinished -= 1
+                self._processed += 1
+                self._condition.notify_all()
+
+    def _process(self, event: _Event):
+        if not event.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = event.hook.trigger(**event.kwargs)
+        except BaseException as e:
+            event.future.set_exception(e)
+        else:
+            event.future.set_result(result)
+
+    def stats(self) -> ShardStats:
+        """
+        ``depth`` is the number of events waiting in the queue,
+        ``lag`` is the number of seconds the oldest of them has been waiting,
+        ``processed`` is the number of events taken off the queue and processed so far.
+        """
+        with self._condition:
+            oldest = self._queue[0] if self._queue else None
+            return ShardStats(
+                depth=len(self._queue),
+                lag=time.monotonic() - oldest.enqueued_at if oldest is not None else 0.0,
+                processed=self._processed,
+            )
+
+    def flush(self, deadline=None) -> bool:
+        """
+        Wait until all events put in the queue so far are processed.
+        Returns ``False`` if that didn't happen by ``deadline``, a ``time.monotonic()`` value.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._unfinished == 0, timeout=_remaining(deadline))
+
+    def stop(self):
+        """
+        Stop accepting new events. The thread stops once it has processed all events in the queue.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def join(self, deadline=None) -> bool:
+        """
+        Wait until the stopped worker has processed all events in the queue and its thread has finished.
+        Returns ``False`` if the events weren't processed by ``deadline``.
+        """
+        flushed = self.flush(deadline=deadline)
+        if self._thread is not None:
+            self._thread.join(timeout=_remaining(deadline))
+        return flushed
+
+
+class Dispatcher:
+    """
+    Triggers hooks in a background thread so that handlers run off the caller's latency path.
+
+    Events wait in a queue of at most ``maxsize`` events (unbounded if ``maxsize`` is ``0``).
+    ``overflow`` decides what happens when an event is submitted while the queue is full:
+
+    - ``'block'`` -- the caller waits until there is space in the queue, except for a handler running
+      in the dispatcher's own thread, which would wait forever, so its event is triggered right away instead;
+    - ``'drop_oldest'`` -- the oldest waiting event is dropped and its future cancelled;
+    - ``'drop_newest'`` -- the submitted event is dropped and its future cancelled.
+    """
+
+    def __init__(self, maxsize=1000, overflow=BLOCK, name='hookery-dispatcher'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Unsupported overflow policy {!r}, expected one of {}'.format(overflow, OVERFLOW_POLICIES))
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.name = name
+        self._workers = [_Worker(maxsize=maxsize, overflow=overflow, name=name)]
+
+    def _select_worker(self, hook, kwargs) -> _Worker:
+        return self._workers[0]
+
+    def submit(self, hook, kwargs):
+        """
+        Schedule ``hook.trigger(**kwargs)`` and return a ``concurrent.futures.Future`` of its result.
+        """
+        # Imported here because concurrent.futures takes long to import and isn't needed until the first event.
+        from concurrent.futures import Future
+
+        future = Future()
+        self._select_worker(hook, kwargs).put(_Event(
+            hook=hook, kwargs=kwargs, future=future, enqueued_at=time.monotonic(),
+        ))
+        return future
+
+    def stats(self) -> list:
+        """
+        Queue metrics of each of the dispatcher's threads, see ``ShardStats``.
+        """
+        return [worker.stats() for worker in self._workers]
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Wait until all events submitted so far are processed.
+        Returns ``False`` if that didn't happen within ``timeout`` seconds, waiting for all threads together.
+        """
+        deadline = _deadline(timeout)
+        flushed = [worker.flush(deadline=deadline) for worker in self._workers]
+        return all(flushed)
+
+    def close(self, timeout=None) -> bool:
+        """
+        Stop accepting new events in all threads and wait until all submitted events are processed.
+        Returns ``False`` if that didn't happen within ``timeout`` seconds, waiting for all threads together.
+        """
+        for worker in self._workers:
+            worker.stop()
+        deadline = _deadline(timeout)
+        joined = [worker.join(deadline=deadline) for worker in self._workers]
+        return all(joined)
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(self.__class__.__name__, self.name)
+
+
+def subject_key(hook, kwargs):
+    return hook.subject
+
+
+class ShardedDispatcher(Dispatcher):
+    """
+    Triggers hooks in ``shards`` background threads, each with its own queue.
+
+    Events are assigned to shards by ``key(hook, kwargs)`` which by default is the hook's subject,
+    so triggers with the same key are handled in the order they were submitted, one at a time,
+    while triggers with different keys may be handled in parallel.
+    ``maxsize`` and ``overflow`` apply to each shard's queue separately.
+    """
+
+    def __init__(self, shards=4, key=subject_key, maxsize=1000, overflow=BLOCK, name='hookery-dispatcher'):
+        super().__init__(maxsize=maxsize, overflow=overflow, name=name)
+        if shards < 1:
+            raise ValueError('Number of shards must be positive, got {}'.format(shards))
+        self.key = key
+        self._workers = [
+            _Worker(maxsize=maxsize, overflow=overflow, name='{}-{}'.format(name, i))
+            for i in range(shards)
+        ]
+
+    def _select_worker(self, hook, kwargs) -> _Worker:
+        key = self.key(hook, kwargs)
+        try:
+            key_hash = hash(key)
+        except TypeError:
+            key_hash = id(key)
+        return self._workers[key_hash % len(self._workers)]
+
+
+_default_dispatcher = None
+_default_dispatcher_lock = threading.Lock()
+
+
+def get_default_dispatcher() -> Dispatcher:
+    """
+    The dispatcher used by hooks which don't have their own ``dispatcher`` set.
+    """
+    global _default_dispatcher
+    if _default_dispatcher is None:
+        with _default_dispatcher_lock:
+            if _default_dispatcher is None:
+                _default_dispatcher = Dispatcher()
+    return _default_dispatcher
+
+
+def flush(timeout=None) -> bool:
+    """
+    Wait until all events submitted to the default dispatcher are processed. Call this on shutdown.
+    """
+    if _default_dispatcher is None:
+        return True
+    return _default_dispatcher.flush(timeout=timeout)
@@ -0,0 +1,133 @@
+import collections
+import sys
+from typing import List
+
+from .base import Hook, _live_hooks
+
+FREE = 'free'
+CLASS = 'class'
+INSTANCE = 'instance'
+
+HookGroupReport = collections.namedtuple('HookGroupReport', [
+    'defining_class', 'kind', 'names', 'hooks', 'direct_handlers', 'cached_handlers', 'retained_bytes',
+])
+
+
+def live_hooks() -> List[Hook]:
+    """
+    All hooks that are currently alive.
+    """
+    return list(_live_hooks)
+
+
+def subject_kind(hook: Hook) -> str:
+    if hook.is_class_associated:
+        return CLASS
+    elif hook.is_instance_associated:
+        return INSTANCE
+    else:
+        return FREE
+
+
+def _owned_raw_handlers(hook: Hook) -> tuple:
+    """
+    The hook's cached tuple of unbound handlers, unless it is shared with a hook it inherits from.
+    """
+    if hook._cached_raw_handlers is None:
+        return ()
+    raw_handlers = hook._cached_raw_handlers[1]
+    if not raw_handlers:
+        return ()
+    for upstream in (hook.parent_class_hook, hook.instance_class_hook):
+        if upstream is not None and upstream._cached_raw_handlers is not None:
+            if upstream._cached_raw_handlers[1] is raw_handlers:
+                return ()
+    return raw_handlers
+
+
+def cached_handlers_count(hook: Hook) -> int:
+    """
+    Number of handler references held by the hook's caches, not counting caches shared with other hooks.
+    """
+    bound_handlers = hook._cached_handlers[1] if hook._cached_handlers is not None else ()
+    return len(_owned_raw_handlers(hook)) + len(bound_handlers)
+
+
+def retained_bytes(hook: Hook) -> int:
+    """
+    Approximate number of bytes retained by the hook itself:
+    the hook object, its attributes, its lists of handlers and caches.
+    Handlers shared with other hooks and handler functions are not counted.
+    """
+    size = sys.getsizeof(hook) + sys.getsizeof(hook.__dict__)
+    size += sys.getsizeof(hook._direct_handlers)
+    size += sum(sys.getsizeof(h) + sys.getsizeof(h.__dict__) for h in hook._direct_handlers)
+    size += sys.getsizeof(hook._triggering_threads)
+    owned = _owned_raw_handlers(hook)
+    if owned:
+        size += sys.getsizeof(owned)
+    if hook._cached_handlers is not None:
+        size += sys.getsizeof(hook._cached_handlers[1])
+        size += sum(sys.getsizeof(h) for h in hook._cached_handlers[1])
+    if hook._dependent_hooks is not None:
+        size += sys.getsizeof(hook._dependent_hooks) + sys.getsizeof(hook._dependent_hooks.data)
+    if hook._memo is not None:
+        size += sys.getsizeof(hook._memo[1])
+    return size
+
+
+def report() -> List[HookGroupReport]:
+    """
+    Live hooks grouped by the class that defined them and by the kind of their subject
+    (free, class, or instance), largest groups by retained bytes first.
+    """
+    groups = collections.OrderedDict()
+    for hook in live_hooks():
+        key = (hook.defining_class, subject_kind(hook))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'names': set(), 'hooks': 0, 'direct_handlers': 0, 'cached_handlers': 0, 'retained_bytes': 0,
+            }
+        if hook.name is not None:
+            group['names'].add(hook.name)
+        group['hooks'] += 1
+        group['direct_handlers'] += len(hook._direct_handlers)
+        group['cached_handlers'] += cached_handlers_count(hook)
+        group['retained_bytes'] += retained_bytes(hook)
+
+    reports = [
+        HookGroupReport(
+            defining_class=defining_class,
+            kind=kind,
+            names=tuple(sorted(group['names'])),
+            **{k: v for k, v in group.items() if k != 'names'}
+        )
+        for (defining_class, kind), group in groups.items()
+    ]
+    reports.sort(key=lambda r: r.retained_bytes, reverse=True)
+    return reports
+
+
+def format_report(reports=None) -> str:
+    """
+    Format the output of ``report()`` as a text table.
+    """
+    if reports is None:
+        reports = report()
+    rows = [('defining class', 'kind', 'hooks', 'direct', 'cached', 'bytes', 'names')]
+    for r in reports:
+        rows.append((
+            r.defining_class.__qualname__ if r.defining_class is not None else '-',
+            r.kind,
+            str(r.hooks),
+            str(r.direct_handlers),
+            str(r.cached_handlers),
+            str(r.retained_bytes),
+            ', '.join(r.names),
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]) - 1)]
+    return '\n'.join(
+        '  '.join(cell.ljust(width) for cell, width in zip(row, widths)) + '  ' + row[-1]
+        for row in rows
+    )
@@ -0,0 +1,42 @@
+import importlib
+from typing import List
+
+
+def import_reference(reference: str) -> callable:
+    """
+    Import the object referred to by a ``'package.module:function'`` string.
+    The part after the colon may be a dotted path of attributes, for example ``'package.module:Class.method'``.
+    """
+    module_name, sep, attr_path = reference.partition(':')
+    if not sep or not module_name or not attr_path:
+        raise ValueError('{!r} is not a valid reference, expected "package.module:function"'.format(reference))
+
+    obj = importlib.import_module(module_name)
+    for attr in attr_path.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def iter_entry_points(group: str):
+    """
+    Entry points of installed distributions in the group, ordered by name.
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        import pkg_resources
+        found = list(pkg_resources.iter_entry_points(group))
+    else:
+        all_entry_points = entry_points()
+        if hasattr(all_entry_points, 'select'):
+            found = list(all_entry_points.select(group=group))
+        else:  # Python < 3.10
+            found = list(all_entry_points.get(group, ()))
+    return sorted(found, key=lambda entry_point: entry_point.name)
+
+
+def load_entry_points(group: str) -> List[callable]:
+    """
+    Load all objects registered as entry points in the group.
+    """
+    return [entry_point.load() for entry_point in iter_entry_points(group)]
@@ -0,0 +1,107 @@
+from .base import HookDescriptor, InstanceHook
+
+
+class ObservableAttr:
+    """
+    Attribute which triggers its own change hook when assigned a value that is different from the current one.
+
+    For an attribute ``city``, an instance hook ``city_changed`` is added to the owner class.
+    Its handlers can ask for ``attr`` (name of the attribute), ``old`` and ``new`` values.
+
+        @hookable
+        class Address:
+            city = ObservableAttr()
+
+        @Address.city_changed
+        def on_city_changed(self, old, new):
+            print(old, '->', new)
+
+    By default the value is stored in the instance's ``__dict__`` under the attribute's own name.
+    For classes with ``__slots__``, pass the name of the slot in which to store the value:
+
+        @hookable
+        class Point:
+            __slots__ = ('_x', '__dict__')
+            x = ObservableAttr(slot='_x')
+
+    If an instance has no ``__dict__`` at all, it can't have an instance-associated hook, so the class-associated
+    hook is triggered instead, with ``self`` set to the instance. Such triggers are batched, scoped, recorded
+    and traced like any others, but as triggers of the class-associated hook shared by all instances.
+
+    Assignments of which no handlers need to know only cost a lookup of the instance-associated hook
+    and a check of the class-associated hook in addition to storing the value.
+
+    Requires Python 3.6+ as it relies on ``__set_name__``.
+    """
+
+    def __init__(self, default=None, slot=None):
+        self.default = default
+        self.slot = slot
+        self.name = None
+        self.hook_name = None
+        self.hook_descriptor = None  # type: HookDescriptor
+        self._slot_descriptor = None
+        self._instance_hook_attr_name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.hook_name = '{}_changed'.format(name)
+        self.hook_descriptor = HookDescriptor(
+            defining_hook=InstanceHook(name=self.hook_name, args=('attr', 'old', 'new')),
+            defining_class=owner,
+        )
+        self._instance_hook_attr_name = self.hook_descriptor.instance_hook_attr_name
+        setattr(owner, self.hook_name, self.hook_descriptor)
+
+        if self.slot is not None:
+            self._slot_descriptor = owner.__dict__[self.slot]
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self._slot_descriptor is not None:
+            try:
+                return self._slot_descriptor.__get__(instance, owner)
+            except AttributeError:
+                return self.default
+        return instance.__dict__.get(self.name, self.default)
+
+    def __set__(self, instance, value):
+        if self._slot_descriptor is not None:
+            try:
+                old = self._slot_descriptor.__get__(instance, None)
+            except AttributeError:
+                old = self.default
+            self._slot_descriptor.__set__(instance, value)
+            instance_dict = getattr(instance, '__dict__', None)
+        else:
+            instance_dict = instance.__dict__
+            old = instance_dict.get(self.name, self.default)
+            instance_dict[self.name] = value
+
+        hook = instance_dict.get(self._instance_hook_attr_name) if instance_dict is not None else None
+        if hook is None:
+            owner = type(instance)
+            class_hook = self.hook_descriptor.__get__(None, owner)
+            if not class_hook:
+                return
+            if instance_dict is None:
+                # No instance-associated hook can be stored, so the class-associated one is triggered instead.
+                self._trigger_change(class_hook, old, value, instance)
+                return
+            hook = self.hook_descriptor.__get__(instance, owner)
+        elif not hook:
+            return
+
+        self._trigger_change(hook, old, value)
+
+    def _trigger_change(self, hook, old, value, instance=None):
+        if old is value or old == value:
+            return
+        kwargs = {'attr': self.name, 'old': old, 'new': value}
+        if instance is not None:
+            kwargs['self'] = instance
+        hook._trigger_validated(kwargs)
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(self.__class__.__name__, self.name)
@@ -0,0 +1,113 @@
+import collections
+import time
+from threading import get_ident
+
+# The flight recorder that records triggers of all hooks, if recording is enabled.
+recorder = None  # type: FlightRecorder
+
+FlightRecord = collections.namedtuple('FlightRecord', [
+    'timestamp', 'hook', 'subject', 'arg_keys', 'duration', 'error', 'thread_id',
+])
+
+
+class FlightRecorder:
+    """
+    Keeps the last ``size`` triggers of hooks in a ring buffer, oldest first, as ``FlightRecord`` entries:
+    when the trigger started (as in ``time.time()``), the hook and its subject, names of the arguments
+    the hook was triggered with, how many seconds the trigger took, and ``repr`` of the exception it raised
+    or ``None`` if it returned.
+
+    Recording a trigger only appends a tuple to a ``collections.deque``, so a recorder can be left on
+    in production and dumped when something goes wrong. If ``dump_on_error`` is set, the recorder
+    dumps itself to ``file`` as soon as a recorded trigger raises an exception.
+    The recorder keeps references to the hooks and subjects it records until they are pushed out of the buffer.
+    """
+
+    def __init__(self, size=1000, dump_on_error=False, file=None):
+        self.size = size
+        self.dump_on_error = dump_on_error
+        self.file = file
+        self._records = collections.deque(maxlen=size)
+
+        # Exception which caused the last dump, so that the same exception raised through
+        # a number of nested triggers only causes one dump.
+        self._dumped_error = None
+
+    def record(self, hook, arg_keys, duration, error=None):
+        """
+        Record a trigger of ``hook`` with arguments named ``arg_keys`` which has just finished
+        after ``duration`` seconds, raising ``error`` if it is set.
+        """
+        # Plain tuples are turned into FlightRecord only when read because creating a namedtuple is much slower.
+        self._records.append((
+            time.time() - duration,
+            hook,
+            hook.subject,
+            arg_keys,
+            duration,
+            None if error is None else repr(error),
+            get_ident(),
+        ))
+        if error is not None and self.dump_on_error and error is not self._dumped_error:
+            self._dumped_error = error
+            self.dump()
+
+    def records(self) -> list:
+        """
+        Recorded triggers, oldest first.
+        """
+        # Copying a deque doesn't call any Python code, so other threads can't append to it halfway through.
+        return [FlightRecord._make(r) for r in self._records.copy()]
+
+    def dump(self, file=None):
+        """
+        Write recorded triggers, oldest first, one per line to ``file``,
+        or to the file passed to the initialiser, or to standard error.
+        """
+        if file is None:
+            file = self.file
+        if file is None:
+            import sys
+            file = sys.stderr
+
+        records = self.records()
+        lines = ['Last {} hook triggers, oldest first:'.format(len(records))]
+        lines.extend(format_record(r) for r in records)
+        file.write('\n'.join(lines) + '\n')
+        file.flush()
+
+    def clear(self):
+        self._records.clear()
+
+    def __len__(self):
+        return len(self._records)
+
+
+def format_record(record: FlightRecord) -> str:
+    return '{}.{:06d} {:.6f}s {} {} subject={!r} args=({}) thread={}'.format(
+        time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.timestamp)),
+        int(record.timestamp % 1 * 1e6),
+        record.duration,
+        'ok' if record.error is None else 'error={}'.format(record.error),
+        record.hook,
+        record.subject,
+        ', '.join(record.arg_keys),
+        record.thread_id,
+    )
+
+
+def enable(new_recorder: FlightRecorder) -> FlightRecorder:
+    """
+    Start recording triggers of all hooks with the flight recorder. Returns the recorder.
+    """
+    global recorder
+    recorder = new_recorder
+    return new_recorder
+
+
+def disable():
+    """
+    Stop recording triggers of all hooks. Recorders set on individual hooks keep recording.
+    """
+    global recorder
+    recorder = None
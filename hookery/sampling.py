@@ -0,0 +1,113 @@
+import collections
+import threading
+import time
+
+SamplingStats = collections.namedtuple('SamplingStats', ['sampled', 'dropped'])
+
+
+class Sampler:
+    """
+    Decides which triggers of a hook, or calls of a handler, happen.
+
+    Pass a sampler as ``sampler=`` when declaring a hook to skip some of its triggers,
+    or when registering a handler to skip some of its calls. The decision is made before
+    anything else is done for the trigger or the handler call, so skipped ones cost next to nothing.
+    A sampler passed to a hook declared in a class is shared by hooks of all its subclasses and instances.
+
+    Counts of sampled (allowed) and dropped (skipped) calls are kept in ``sampled`` and ``dropped``.
+    """
+
+    def __init__(self):
+        self.sampled = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def _decide(self) -> bool:
+        raise NotImplementedError()
+
+    def __call__(self) -> bool:
+        with self._lock:
+            if self._decide():
+                self.sampled += 1
+                return True
+            self.dropped += 1
+            return False
+
+    def stats(self) -> SamplingStats:
+        return SamplingStats(sampled=self.sampled, dropped=self.dropped)
+
+    def reset(self):
+        with self._lock:
+            self.sampled = 0
+            self.dropped = 0
+
+
+class EveryNth(Sampler):
+    """
+    Samples the first call and every ``n``-th call after it.
+    """
+
+    def __init__(self, n):
+        if n < 1:
+            raise ValueError('n must be positive, got {}'.format(n))
+        super().__init__()
+        self.n = n
+        self._calls = 0
+
+    def _decide(self) -> bool:
+        sample = self._calls % self.n == 0
+        self._calls += 1
+        return sample
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.n)
+
+
+class Probability(Sampler):
+    """
+    Samples each call with probability ``p``.
+    """
+
+    def __init__(self, p):
+        if not 0 <= p <= 1:
+            raise ValueError('p must be between 0 and 1, got {}'.format(p))
+        super().__init__()
+        self.p = p
+
+        # Imported here because random is not needed by hooks which don't sample.
+        import random
+        self._random = random.random
+
+    def _decide(self) -> bool:
+        return self._random() < self.p
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.p)
+
+
+class TokenBucket(Sampler):
+    """
+    Samples at most ``rate`` calls per second on average, allowing bursts of up to ``burst`` calls
+    (by default ``rate``, but at least one).
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError('rate must be positive, got {}'.format(rate))
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate)
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+
+    def _decide(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def __repr__(self):
+        return '{}(rate={}, burst={})'.format(self.__class__.__name__, self.rate, self.burst)
@@ -0,0 +1,217 @@
+import threading
+import time
+
+# The tracer that records spans of triggers and handlers, if tracing is enabled.
+tracer = None  # type: Tracer
+
+
+class Span:
+    """
+    A timed trigger of a hook or call of a handler, with spans of triggers and handler calls nested in it.
+    """
+
+    __slots__ = ('kind', 'name', 'hook', 'subject', 'thread_id', 'start', 'end', 'error', 'children')
+
+    def __init__(self, kind, name, hook, subject):
+        self.kind = kind
+        self.name = name
+        self.hook = hook
+        self.subject = subject
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+        self.children = []
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start if self.end is not None else None
+
+    def walk(self):
+        """
+        Yield this span and all spans nested in it, depth first.
+        """
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def as_dict(self) -> dict:
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'hook': self.hook,
+            'subject': self.subject,
+            'start': self.start,
+            'duration': self.duration,
+            'error': self.error,
+            'children': [child.as_dict() for child in self.children],
+        }
+
+    def __repr__(self):
+        return '<{} {} {}>'.format(self.__class__.__name__, self.kind, self.name)
+
+
+class Tracer:
+    """
+    Records trees of spans: trigger -> handler -> nested trigger -> handler...
+
+    Whether a tree is recorded is decided when its root trigger starts, with probability ``sample_rate``.
+    Triggers nested in an unsampled trigger are not recorded either.
+    Each finished tree is passed to ``exporter.export(span)`` if ``exporter`` is set,
+    otherwise it is appended to ``tracer.spans``.
+    """
+
+    def __init__(self, sample_rate=1.0, exporter=None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.spans = []
+        self._local = threading.local()
+
+    def _should_sample(self) -> bool:
+        if self.sample_rate >= 1:
+            return True
+        import random
+        return random.random() < self.sample_rate
+
+    def is_recording(self) -> bool:
+        return getattr(self._local, 'span', None) is not None
+
+    def trace_trigger(self, hook, kwargs):
+        """
+        Call ``hook._trigger(kwargs)``, recording it as a span if it is sampled.
+        """
+        local = self._local
+        parent = getattr(local, 'span', None)
+        if parent is None:
+            unsampled = getattr(local, 'unsampled', 0)
+            if unsampled or not self._should_sample():
+                local.unsampled = unsampled + 1
+                try:
+                    return hook._trigger(kwargs)
+                finally:
+                    local.unsampled = unsampled
+
+        with self.span('trigger', hook, name=str(hook)):
+            return hook._trigger(kwargs)
+
+    def span(self, kind, hook, name) -> '_SpanContext':
+        """
+        Context manager which records the ``with`` block as a span nested in the current span.
+        """
+        return _SpanContext(self, kind, hook, name)
+
+    def _finish(self, span: Span):
+        if self.exporter is not None:
+            self.exporter.export(span)
+        else:
+            self.spans.append(span)
+
+
+class _SpanContext:
+    __slots__ = ('tracer', 'kind', 'hook', 'name', 'span', 'parent')
+
+    def __init__(self, tracer: Tracer, kind, hook, name):
+        self.tracer = tracer
+        self.kind = kind
+        self.hook = hook
+        self.name = name
+        self.span = None
+        self.parent = None
+
+    def __enter__(self) -> Span:
+        local = self.tracer._local
+        self.parent = getattr(local, 'span', None)
+        self.span = Span(kind=self.kind, name=self.name, hook=str(self.hook), subject=repr(self.hook.subject))
+        local.span = self.span
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        span = self.span
+        if exc_val is not None:
+            span.error = repr(exc_val)
+        span.end = time.perf_counter()
+        self.tracer._local.span = self.parent
+        if self.parent is None:
+            self.tracer._finish(span)
+        else:
+            self.parent.children.append(span)
+
+
+class JsonLinesExporter:
+    """
+    Writes each finished tree of spans as one line of JSON to ``file``.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        import json
+        line = json.dumps(span.as_dict())
+        with self._lock:
+            self.file.write(line + '\n')
+
+    def close(self):
+        self.file.flush()
+
+
+class ChromeTraceExporter:
+    """
+    Writes spans to ``file`` as complete events of the Chrome trace event format (JSON array format)
+    which can be loaded in ``chrome://tracing`` or Perfetto to see them as a flame graph.
+    Call ``close()`` to terminate the array.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self._lock = threading.Lock()
+        self._started = False
+
+        import os
+        self._pid = os.getpid()
+
+    def export(self, span: Span):
+        import json
+        events = []
+        for s in span.walk():
+            event = {
+                'name': s.name,
+                'cat': s.kind,
+                'ph': 'X',
+                'ts': s.start * 1e6,
+                'dur': s.duration * 1e6,
+                'pid': self._pid,
+                'tid': s.thread_id,
+                'args': {'hook': s.hook, 'subject': s.subject},
+            }
+            if s.error is not None:
+                event['args']['error'] = s.error
+            events.append(json.dumps(event))
+
+        with self._lock:
+            for event in events:
+                self.file.write((',\n' if self._started else '[\n') + event)
+                self._started = True
+
+    def close(self):
+        with self._lock:
+            self.file.write(('\n]\n' if self._started else '[]\n'))
+            self.file.flush()
+
+
+def enable(new_tracer: Tracer) -> Tracer:
+    """
+    Start recording triggers with the tracer. Returns the tracer.
+    """
+    global tracer
+    tracer = new_tracer
+    return new_tracer
+
+
+def disable():
+    """
+    Stop recording triggers.
+    """
+    global tracer
+    tracer = None
@@ -1,18 +1,85 @@
+import collections
 import functools
-import inspect
+import threading
 
+FuncInfo = collections.namedtuple('FuncInfo', [
+    'func', 'parameters', 'is_generator', 'optional_args_func', 'positional',
+])
 
-def optional_args_func(func) -> callable:
+
+class Lazy:
+    """
+    Value of a trigger argument that is computed by calling ``func`` only if some handler asks for the argument.
+    The value is computed at most once.
+
+        hook.trigger(payload=Lazy(lambda: serialize(obj)))
+    """
+
+    __slots__ = ('func', '_value', '_evaluated')
+
+    def __init__(self, func):
+        self.func = func
+        self._value = None
+        self._evaluated = False
+
+    @property
+    def value(self):
+        if not self._evaluated:
+            self._value = self.func()
+            self._evaluated = True
+            self.func = None
+        return self._value
+
+    def __repr__(self):
+        if self._evaluated:
+            return '{}(value={!r})'.format(self.__class__.__name__, self._value)
+        return '{}({!r})'.format(self.__class__.__name__, self.func)
+
+
+def get_func_info(func) -> FuncInfo:
+    """
+    Introspect `func` and wrap it with `optional_args_func`.
+    The result is cached on the function object itself so each function is
+    introspected and wrapped only once no matter how many hooks it is registered with.
+    Functions that don't allow setting attributes, for example bound methods, are introspected every time.
+    """
+    info = getattr(func, '__dict__', {}).get('_hookery_func_info')
+    if info is not None and info.func is func:
+        return info
+
+    # Imported here because inspect takes long to import and isn't needed until the first handler is registered.
+    import inspect
+
+    func_sig = inspect.signature(func)
+    info = FuncInfo(
+        func=func,
+        parameters=tuple(func_sig.parameters),
+        is_generator=inspect.isgeneratorfunction(func),
+        optional_args_func=optional_args_func(func, func_sig=func_sig),
+        # Whether all parameters can be passed positionally, in the order they are declared.
+        positional=all(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in func_sig.parameters.values()),
+    )
+    try:
+        func._hookery_func_info = info
+    except AttributeError:
+        pass
+    return info
+
+
+def optional_args_func(func, func_sig=None) -> callable:
     """
     Given a function or generator `func`, return a function/generator
     that takes any number of kwargs and calls `func` with only the args/kwargs
-    that `func` expects.
+    that `func` expects. ``Lazy`` values of these kwargs are evaluated, others are not.
     """
     if getattr(func, '_optional_args_func', False):
         return func
 
+    import inspect
+
     is_generator = inspect.isgeneratorfunction(func)
-    func_sig = inspect.signature(func)
+    if func_sig is None:
+        func_sig = inspect.signature(func)
     expects_nothing = not func_sig.parameters
 
     if is_generator:
@@ -21,7 +88,7 @@ def optional_args_func(func) -> callable:
             if expects_nothing:
                 yield from func()
             else:
-                bound_arguments = func_sig.bind(*args, **{k: v for k, v in kwargs.items() if k in func_sig.parameters})
+                bound_arguments = func_sig.bind(*args, **_expected_kwargs(kwargs, func_sig.parameters))
                 yield from func(*bound_arguments.args, **bound_arguments.kwargs)
     else:
         @functools.wraps(func)
@@ -29,10 +96,43 @@ def optional_args_func(func) -> callable:
             if expects_nothing:
                 return func()
             else:
-                bound_arguments = func_sig.bind(*args, **{k: v for k, v in kwargs.items() if k in func_sig.parameters})
+                bound_arguments = func_sig.bind(*args, **_expected_kwargs(kwargs, func_sig.parameters))
                 return func(*bound_arguments.args, **bound_arguments.kwargs)
 
     # Mark it so that we don't double wrap our own
     setattr(wrapped, '_optional_args_func', True)
 
     return wrapped
+
+
+def _expected_kwargs(kwargs, parameters) -> dict:
+    return {k: v.value if type(v) is Lazy else v for k, v in kwargs.items() if k in parameters}
+
+
+class ThreadLocalVar:
+    """
+    Stand-in for ``contextvars.ContextVar`` on Pythons that don't have ``contextvars`` (before 3.7).
+    Values are local to threads rather than to contexts.
+    """
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+        self._local = threading.local()
+
+    def get(self):
+        return getattr(self._local, 'value', self.default)
+
+    def set(self, value):
+        token = self.get()
+        self._local.value = value
+        return token
+
+    def reset(self, token):
+        self._local.value = token
+
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # Python < 3.7
+    ContextVar = ThreadLocalVar
@@ -0,0 +1,74 @@
+import collections
+import threading
+import weakref
+
+SlowHandler = collections.namedtuple('SlowHandler', [
+    'hook', 'handler', 'handler_name', 'hook_name', 'subject', 'duration', 'budget',
+])
+
+
+class Watchdog:
+    """
+    Receives reports of handlers which took longer than their latency budget.
+
+    Each violation is counted per handler and passed to ``on_violation`` as a ``SlowHandler``,
+    or logged as a warning to the ``hookery`` logger if ``on_violation`` is not set.
+    If ``mute_after`` is set, a handler is muted after that many violations,
+    which means it is skipped by all hooks it is registered with until it is unmuted.
+    """
+
+    def __init__(self, on_violation=None, mute_after=None):
+        self.on_violation = on_violation
+        self.mute_after = mute_after
+        # Handler -> number of violations. Handlers are not kept alive by being counted,
+        # so handlers which are unregistered and dropped don't accumulate in long-running processes.
+        self.violations = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def report(self, hook, handler, duration, budget):
+        """
+        Report that ``handler`` (an unbound ``Handler``) took ``duration`` seconds
+        when triggered by ``hook`` which is more than ``budget`` seconds.
+        """
+        with self._lock:
+            count = self.violations.get(handler, 0) + 1
+            self.violations[handler] = count
+
+        slow_handler = SlowHandler(
+            hook=hook,
+            handler=handler,
+            handler_name=handler.name,
+            hook_name=hook.name,
+            subject=hook.subject,
+            duration=duration,
+            budget=budget,
+        )
+
+        if self.on_violation is not None:
+            self.on_violation(slow_handler)
+        else:
+            get_logger().warning(
+                'Handler %s of %s took %.6fs, over its latency budget of %.6fs (subject %r)',
+                slow_handler.handler_name, hook, duration, budget, slow_handler.subject,
+            )
+
+        if self.mute_after is not None and count >= self.mute_after and not handler.muted:
+            handler.mute()
+            get_logger().warning('Handler %s of %s muted after %d latency budget violations', handler.name, hook, count)
+
+    def reset(self):
+        """
+        Forget all violations counted so far. Does not unmute handlers.
+        """
+        with self._lock:
+            self.violations.clear()
+
+
+def get_logger():
+    # Imported here because logging takes long to import and is only needed when a handler is slow.
+    import logging
+
+    return logging.getLogger('hookery')
+
+
+default_watchdog = Watchdog()
@@ -0,0 +1,21 @@
+from hookery import ObservableAttr, hookable
+
+
+@hookable
+class Address:
+    city = ObservableAttr()
+    country = ObservableAttr()
+
+
+address = Address()
+address.city = 'London'
+address.country = 'UK'
+
+
+@address.city_changed
+def check_city(old, new):
+    if new != 'London':
+        print('Why did you move from {} to {}?'.format(old, new))
+
+
+address.city = 'Guildford'
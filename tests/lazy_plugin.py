@@ -0,0 +1,22 @@
+"""
+Handlers registered by reference in test_lazy_handlers.py.
+Not imported by anything else so that tests can check when it is imported.
+"""
+
+
+def on_saved(name):
+    return 'saved {}'.format(name)
+
+
+def on_deleted(name):
+    return 'deleted {}'.format(name)
+
+
+def invalid(unsupported):
+    return unsupported
+
+
+class Handlers:
+    @staticmethod
+    def on_saved(name):
+        return 'Handlers saved {}'.format(name)
@@ -0,0 +1,111 @@
+import pytest
+
+from hookery import ClassHook, Hook, InstanceHook, hookable
+
+
+def test_around_handlers_wrap_one_another():
+    hook = Hook(around=True)
+    assert hook.meta['around'] is True
+
+    @hook
+    def outer(call_next, x):
+        return ['outer', x] + call_next()
+
+    @hook
+    def inner(call_next, x):
+        return ['inner', x] + (call_next() or [])
+
+    assert hook.trigger(x=1) == ['outer', 1, 'inner', 1]
+
+
+def test_around_handler_can_short_circuit():
+    hook = Hook(around=True)
+    cache = {}
+    calls = []
+
+    @hook
+    def caching(call_next, key):
+        if key not in cache:
+            cache[key] = call_next()
+        return cache[key]
+
+    @hook
+    def expensive(key):
+        calls.append(key)
+        return key * 2
+
+    assert hook.trigger(key=3) == 6
+    assert hook.trigger(key=3) == 6
+    assert hook.trigger(key=4) == 8
+    assert calls == [3, 4]
+
+
+def test_call_next_accepts_overrides():
+    hook = Hook(around=True)
+
+    @hook
+    def doubler(call_next, x):
+        return call_next(x=x * 2)
+
+    @hook
+    def result(x):
+        return x
+
+    assert hook.trigger(x=5) == 10
+
+
+def test_empty_around_hook_returns_none():
+    assert Hook(around=True).trigger() is None
+
+
+def test_around_hook_respects_class_hierarchy():
+    @hookable
+    class Base:
+        handle = InstanceHook(around=True)
+
+        @handle
+        def base_layer(self, call_next):
+            return 'base({})'.format(call_next())
+
+    class Derived(Base):
+        @Base.handle
+        def derived_layer(self, call_next):
+            return 'derived({})'.format(call_next())
+
+    d = Derived()
+
+    @d.handle
+    def instance_layer():
+        return 'instance'
+
+    assert d.handle.trigger() == 'base(derived(instance))'
+    assert Derived().handle.trigger() == 'base(derived(None))'
+
+
+def test_around_chain_is_rebuilt_when_parent_handlers_change():
+    @hookable
+    class Base:
+        handle = ClassHook(around=True)
+
+    class Derived(Base):
+        pass
+
+    @Derived.handle
+    def derived_layer(call_next):
+        return 'derived'
+
+    assert Derived.handle.trigger() == 'derived'
+
+    @Base.handle
+    def base_layer(call_next):
+        return 'base({})'.format(call_next())
+
+    assert Derived.handle.trigger() == 'base(derived)'
+
+
+def test_call_next_is_allowed_with_strict_args():
+    hook = Hook(args=['x'], around=True)
+    hook(lambda call_next, x: call_next())
+
+    with pytest.raises(RuntimeError):
+        Hook(args=['x'])(lambda call_next, x: None)
@@ -0,0 +1,96 @@
+import pytest
+
+import hookery
+from hookery import Hook, InstanceHook, hookable
+
+
+@hookable
+class Address:
+    updated = InstanceHook()
+
+    def __init__(self):
+        self.calls = []
+
+        @self.updated
+        def record(field=None, fields=None):
+            self.calls.append(fields or field)
+
+
+def test_hook_batch_coalesces_triggers():
+    address = Address()
+
+    with address.updated.batch():
+        assert address.updated.trigger(field='city') is None
+        address.updated.trigger(field='country')
+        assert address.calls == []
+
+    assert address.calls == ['country']
+
+
+def test_batch_with_custom_merge():
+    address = Address()
+
+    def merge(old, new):
+        return {'fields': old.get('fields', [old.get('field')]) + [new['field']]}
+
+    with address.updated.batch(merge=merge):
+        for field in ('city', 'country', 'street'):
+            address.updated.trigger(field=field)
+
+    assert address.calls == [['city', 'country', 'street']]
+
+
+def test_deferred_coalesces_by_hook_and_subject():
+    a1 = Address()
+    a2 = Address()
+    free = Hook()
+    free_calls = []
+    free(lambda: free_calls.append(1))
+
+    with hookery.deferred():
+        a1.updated.trigger(field='city')
+        a2.updated.trigger(field='city')
+        a1.updated.trigger(field='country')
+        free.trigger()
+        free.trigger()
+
+    assert a1.calls == ['country']
+    assert a2.calls == ['city']
+    assert free_calls == [1]
+
+
+def test_hook_batch_does_not_defer_other_hooks():
+    a1 = Address()
+    a2 = Address()
+
+    with a1.updated.batch():
+        a1.updated.trigger(field='city')
+        a2.updated.trigger(field='city')
+        assert a1.calls == []
+        assert a2.calls == ['city']
+
+    assert a1.calls == ['city']
+
+
+def test_batch_discards_recorded_triggers_on_exception():
+    address = Address()
+
+    with pytest.raises(ValueError):
+        with hookery.deferred():
+            address.updated.trigger(field='city')
+            raise ValueError()
+
+    assert address.calls == []
+    assert hookery.batching.open_batches == 0
+
+
+def test_nested_batches():
+    address = Address()
+
+    with hookery.deferred():
+        with address.updated.batch():
+            address.updated.trigger(field='city')
+        assert address.calls == []
+        address.updated.trigger(field='country')
+
+    assert address.calls == ['country']
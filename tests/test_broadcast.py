@@ -0,0 +1,240 @@
+import multiprocessing
+import socket
+import time
+
+import pytest
+
+from hookery import Hook
+from hookery.broadcast import Broadcaster, PipeTransport, QueueTransport, SocketTransport
+
+
+def pipe_transports():
+    a, b = multiprocessing.Pipe()
+    return PipeTransport(a), PipeTransport(b)
+
+
+def socket_transports():
+    a, b = socket.socketpair()
+    return SocketTransport(a), SocketTransport(b)
+
+
+def queue_transports():
+    q1, q2 = multiprocessing.Queue(), multiprocessing.Queue()
+    return QueueTransport(outbox=q1, inbox=q2), QueueTransport(outbox=q2, inbox=q1)
+
+
+def poll_until(broadcaster, count, timeout=5):
+    replayed = 0
+    deadline = time.monotonic() + timeout
+    while replayed < count and time.monotonic() < deadline:
+        replayed += broadcaster.poll(timeout=0.05)
+    return replayed
+
+
+@pytest.mark.parametrize('make_transports', [pipe_transports, socket_transports, queue_transports])
+def test_trigger_is_replayed_in_peer(make_transports):
+    transport_a, transport_b = make_transports()
+
+    calls_a = []
+    hook_a = Hook()
+    hook_a(lambda key: calls_a.append(key))
+    a = Broadcaster(peers=[transport_a])
+    a.register('invalidate', hook_a)
+
+    calls_b = []
+    hook_b = Hook()
+    hook_b(lambda key: calls_b.append(key))
+    b = Broadcaster(peers=[transport_b])
+    b.register('invalidate', hook_b)
+
+    assert a.trigger('invalidate', key='users') == [None]
+    a.trigger('invalidate', key='groups')
+    assert calls_a == ['users', 'groups']
+
+    assert a.flush(timeout=5)
+    assert poll_until(b, 2) == 2
+    assert calls_b == ['users', 'groups']
+
+    # Replayed triggers are not sent back.
+    assert a.poll() == 0
+
+    b.send('invalidate', {'key': 'only-in-peer'})
+    assert b.flush(timeout=5)
+    assert poll_until(a, 1) == 1
+    assert calls_a == ['users', 'groups', 'only-in-peer']
+    assert calls_b == ['users', 'groups']
+
+    a.close(timeout=5)
+    b.close(timeout=5)
+
+
+def test_triggers_are_batched():
+    transport_a, transport_b = pipe_transports()
+    a = Broadcaster(peers=[transport_a], batch_size=50, flush_interval=1)
+    a.register('event', Hook())
+
+    for i in range(100):
+        a.trigger('event', i=i)
+    assert a.flush(timeout=5)
+
+    messages = []
+    data = transport_b.recv(timeout=1)
+    while data is not None:
+        messages.append(data)
+        data = transport_b.recv(timeout=0.1)
+    assert len(messages) == 2
+    a.close(timeout=5)
+
+
+def test_listener_replays_in_background():
+    transport_a, transport_b = socket_transports()
+    a = Broadcaster(peers=[transport_a])
+    a.register('event', Hook())
+
+    calls = []
+    hook_b = Hook()
+    hook_b(lambda i: calls.append(i))
+    b = Broadcaster(peers=[transport_b])
+    b.register('event', hook_b)
+    b.start_listener(interval=0.01)
+
+    a.trigger('event', i=1)
+    a.flush(timeout=5)
+
+    deadline = time.monotonic() + 5
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert calls == [1]
+
+    a.close(timeout=5)
+    b.close(timeout=5)
+
+
+def test_peer_that_fails_to_send_is_dropped():
+    dead_sock, closed_end = socket.socketpair()
+    closed_end.close()
+    dead = SocketTransport(dead_sock)
+    transport_a, transport_b = pipe_transports()
+
+    a = Broadcaster(peers=[dead, transport_a])
+    a.register('event', Hook())
+
+    calls = []
+    hook_b = Hook()
+    hook_b(lambda i: calls.append(i))
+    b = Broadcaster(peers=[transport_b])
+    b.register('event', hook_b)
+
+    a.trigger('event', i=1)
+    assert a.flush(timeout=5)
+    a.trigger('event', i=2)
+    assert a.flush(timeout=5)
+
+    assert a.peers == [transport_a]
+    assert a.failed_peers == [dead]
+    assert poll_until(b, 2) == 2
+    assert calls == [1, 2]
+
+    a.close(timeout=5)
+    b.close(timeout=5)
+
+
+def test_listener_keeps_replaying_after_handler_fails():
+    transport_a, transport_b = socket_transports()
+    a = Broadcaster(peers=[transport_a], batch_size=3, flush_interval=1)
+    a.register('event', Hook())
+
+    calls = []
+    hook_b = Hook()
+
+    @hook_b
+    def handler(i):
+        if i == 1:
+            raise ValueError(i)
+        calls.append(i)
+
+    b = Broadcaster(peers=[transport_b])
+    b.register('event', hook_b)
+    b.start_listener(interval=0.01)
+
+    for i in range(3):
+        a.trigger('event', i=i)
+    a.flush(timeout=5)
+    a.trigger('event', i=3)
+    a.flush(timeout=5)
+
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert calls == [0, 2, 3]
+    assert b._listener.is_alive()
+
+    a.close(timeout=5)
+    b.close(timeout=5)
+
+
+def test_peer_that_fails_to_receive_is_dropped():
+    class ResetTransport:
+        def recv(self, timeout=0):
+            raise ConnectionResetError()
+
+        def close(self):
+            pass
+
+    reset = ResetTransport()
+    transport_a, transport_b = pipe_transports()
+    a = Broadcaster(peers=[transport_a])
+    a.register('event', Hook())
+
+    calls = []
+    hook_b = Hook()
+    hook_b(lambda i: calls.append(i))
+    b = Broadcaster(peers=[reset, transport_b])
+    b.register('event', hook_b)
+
+    a.trigger('event', i=1)
+    assert a.flush(timeout=5)
+    assert poll_until(b, 1) == 1
+
+    assert calls == [1]
+    assert b.peers == [transport_b]
+    assert b.failed_peers == [reset]
+
+    a.close(timeout=5)
+    b.close(timeout=5)
+
+
+def test_sending_unknown_hook_name_fails():
+    with pytest.raises(KeyError):
+        Broadcaster().send('unknown', {})
+
+
+def _child(connection):
+    calls = []
+    hook = Hook()
+    hook(lambda key: calls.append(key))
+    broadcaster = Broadcaster(peers=[PipeTransport(connection)])
+    broadcaster.register('invalidate', hook)
+    poll_until(broadcaster, 1)
+    broadcaster.trigger('invalidate', key='ack:{}'.format(calls[0]))
+    broadcaster.close(timeout=5)
+
+
+def test_broadcast_between_processes():
+    parent_end, child_end = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_child, args=(child_end,))
+    process.start()
+
+    calls = []
+    hook = Hook()
+    hook(lambda key: calls.append(key))
+    broadcaster = Broadcaster(peers=[PipeTransport(parent_end)])
+    broadcaster.register('invalidate', hook)
+
+    broadcaster.trigger('invalidate', key='users')
+    broadcaster.flush(timeout=5)
+    poll_until(broadcaster, 1)
+    process.join(timeout=5)
+
+    assert calls == ['users', 'ack:users']
+    broadcaster.close(timeout=5)
@@ -0,0 +1,216 @@
+import pytest
+
+from hookery import InstanceHook, ParentAttr, hookable
+
+
+def make_classes():
+    @hookable
+    class Document:
+        changed = InstanceHook(args=('value',))
+        field_changed = InstanceHook(args=('value',))
+
+    @hookable
+    class Section:
+        document = ParentAttr()
+        changed = InstanceHook(args=('value',), bubble_to='document')
+
+    @hookable
+    class Field:
+        section = ParentAttr()
+        document = ParentAttr()
+        changed = InstanceHook(args=('value',), bubble_to='section')
+        renamed = InstanceHook(args=('value',), bubble_to='document.field_changed')
+
+    return Document, Section, Field
+
+
+def test_trigger_bubbles_up_to_parents():
+    Document, Section, Field = make_classes()
+    calls = []
+
+    @Document.changed
+    def document_changed(self, value, propagation):
+        calls.append(('document', value, propagation.origin.subject))
+
+    @Section.changed
+    def section_changed(self, value):
+        calls.append(('section', value))
+
+    document = Document()
+    section = Section()
+    section.document = document
+    field = Field()
+    field.section = section
+
+    @field.changed
+    def field_changed(value):
+        calls.append(('field', value))
+        return 'field'
+
+    assert field.changed.trigger(value=1) == ['field']
+    assert calls == [('field', 1), ('section', 1), ('document', 1, field)]
+
+
+def test_route_is_precomputed_when_parent_is_attached():
+    Document, Section, Field = make_classes()
+    first, second = Document(), Document()
+    section = Section()
+
+    hook = section.changed
+    assert hook._bubble_target is None
+
+    section.document = first
+    assert hook._bubble_target is first.changed
+
+    section.document = second
+    assert hook._bubble_target is second.changed
+
+    del section.document
+    assert hook._bubble_target is None
+    assert section.document is None
+
+
+def test_route_of_hook_created_after_parent_is_attached():
+    Document, Section, Field = make_classes()
+    document = Document()
+    section = Section()
+    section.document = document
+
+    assert section.changed._bubble_target is document.changed
+
+
+def test_bubble_to_hook_with_different_name():
+    Document, Section, Field = make_classes()
+    calls = []
+    Document.field_changed(lambda value: calls.append(('field_changed', value)))
+    Document.changed(lambda value: calls.append(('changed', value)))
+
+    field = Field()
+    field.document = Document()
+    field.renamed.trigger(value='x')
+
+    assert calls == [('field_changed', 'x')]
+
+
+def test_stop_propagation():
+    Document, Section, Field = make_classes()
+    calls = []
+
+    @Section.changed
+    def stop(self, value, propagation):
+        calls.append('section first')
+        propagation.stop()
+
+    @Section.changed
+    def after_stop(self, value):
+        calls.append('section second')
+
+    Document.changed(lambda value: calls.append('document'))
+
+    section = Section()
+    section.document = Document()
+    section.changed.trigger(value=1)
+
+    assert calls == ['section first', 'section second']
+
+
+def test_direct_trigger_passes_propagation_starting_at_the_hook():
+    Document, Section, Field = make_classes()
+    propagations = []
+
+    @Document.changed
+    def on_change(self, value, propagation):
+        propagations.append((value, propagation.origin, propagation.hooks))
+
+    document = Document()
+    document.changed.trigger(value=2)
+    document.changed.fire(3)
+
+    assert propagations == [
+        (2, document.changed, [document.changed]),
+        (3, document.changed, [document.changed]),
+    ]
+
+
+def test_disabled_parent_hook_is_skipped_but_trigger_bubbles_further():
+    Document, Section, Field = make_classes()
+    calls = []
+    Document.changed(lambda value: calls.append('document'))
+    Section.changed(lambda value: calls.append('section'))
+
+    document = Document()
+    section = Section()
+    section.document = document
+    field = Field()
+    field.section = section
+
+    section.changed.disable()
+    field.changed.trigger(value=1)
+
+    assert calls == ['document']
+
+
+def test_hook_that_only_bubbles_to_disabled_hooks_is_falsy():
+    Document, Section, Field = make_classes()
+    Section.changed(lambda value: None)
+
+    section = Section()
+    field = Field()
+    field.section = section
+    assert field.changed
+
+    section.changed.disable()
+    assert not field.changed
+
+    Document.changed(lambda value: None)
+    section.document = Document()
+    assert field.changed
+
+
+def test_cycles_are_not_followed():
+    @hookable
+    class Node:
+        parent = ParentAttr()
+        changed = InstanceHook(bubble_to='parent')
+
+    calls = []
+    Node.changed(lambda self: calls.append(self))
+
+    a, b = Node(), Node()
+    a.parent = b
+    b.parent = a
+
+    a.changed.trigger()
+    assert calls == [a, b]
+
+
+def test_parent_without_target_hook_is_not_attached():
+    Document, Section, Field = make_classes()
+    document = Document()
+    field = Field()
+    field.renamed
+    field.document = document
+
+    with pytest.raises(ValueError) as exc_info:
+        field.document = Section()
+    assert "bubble_to='document.field_changed'" in str(exc_info.value)
+
+    assert field.document is document
+    assert field.renamed._bubble_target is document.field_changed
+
+
+def test_hook_is_truthy_if_triggers_bubble_up_to_handlers():
+    Document, Section, Field = make_classes()
+    document = Document()
+    section = Section()
+    field = Field()
+    field.section = section
+
+    assert not field.changed
+    section.document = document
+    assert not field.changed
+
+    document.changed(lambda value: None)
+    assert field.changed
+    assert section.changed
+    assert not field.renamed
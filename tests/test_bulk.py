@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+
+from hookery import Hook, InstanceHook, hookable
+
+
+def test_bulk_changes_reset_caches_once():
+    @hookable
+    class Plugin:
+        loaded = InstanceHook()
+
+    plugin = Plugin()
+    class_hook = Plugin.loaded
+    existing = class_hook(lambda: 'existing')
+    assert plugin.loaded.trigger() == ['existing']
+
+    class_version = class_hook._version
+    instance_version = plugin.loaded._version
+
+    with class_hook.bulk():
+        for i in range(10):
+            class_hook(lambda i=i: i)
+        class_hook.unregister_handler(existing)
+
+        # Changes are not visible until the end of the block.
+        assert plugin.loaded.trigger() == ['existing']
+
+    assert class_hook._version == class_version + 1
+    assert plugin.loaded._version == instance_version + 1
+    assert plugin.loaded.trigger() == list(range(10))
+    assert class_hook.handler_count == 10
+    assert plugin.loaded.handler_count == 10
+
+
+def test_register_handlers():
+    hook = Hook(args=('x',))
+    version = hook._version
+
+    handlers = hook.register_handlers([lambda x: x, lambda x: x * 2, lambda x: x * 3])
+
+    assert len(handlers) == 3
+    assert hook._version == version + 1
+    assert hook.trigger(x=2) == [2, 4, 6]
+    assert hook.has_handler(handlers[1])
+
+
+def test_bulk_changes_are_discarded_if_block_raises():
+    hook = Hook(args=('x',))
+    hook(lambda x: x)
+
+    with pytest.raises(RuntimeError):
+        hook.register_handlers([lambda x: -x, lambda y: y])
+
+    assert hook.trigger(x=1) == [1]
+    assert hook.handler_count == 1
+
+
+def test_unregister_handler_registered_in_same_bulk():
+    hook = Hook()
+
+    def handler():
+        return 'handler'
+
+    with hook.bulk():
+        hook(handler)
+        hook.unregister_handler(handler)
+        with pytest.raises(ValueError):
+            hook.unregister_handler(handler)
+
+    assert hook.trigger() == []
+    assert hook.handler_count == 0
+
+
+def test_nested_bulk_changes_are_published_by_outermost_block():
+    hook = Hook()
+    version = hook._version
+
+    with hook.bulk():
+        hook(lambda: 1)
+        with hook.bulk():
+            hook(lambda: 2)
+        assert hook._version == version
+
+    assert hook._version == version + 1
+    assert hook.trigger() == [1, 2]
+
+
+def test_other_threads_are_not_blocked_by_bulk_change():
+    hook = Hook()
+    existing = hook(lambda: 'existing')
+    created = []
+
+    def change_in_other_thread():
+        created.append(Hook())
+        hook(lambda: 'other')
+        hook.unregister_handler(existing)
+
+    with hook.bulk():
+        hook(lambda: 'bulk')
+        thread = threading.Thread(target=change_in_other_thread)
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert len(created) == 1
+        assert hook.trigger() == ['other']
+
+    assert hook.trigger() == ['other', 'bulk']
+    assert hook.handler_count == 2
+
+
+def test_bulk_change_unregisters_handler_registered_before_it():
+    hook = Hook()
+    existing = hook(lambda: 'existing')
+    started = threading.Event()
+    changed = threading.Event()
+
+    def register_in_other_thread():
+        started.wait()
+        hook(lambda: 'other')
+        changed.set()
+
+    thread = threading.Thread(target=register_in_other_thread)
+    thread.start()
+    with hook.bulk():
+        hook.unregister_handler(existing)
+        started.set()
+        changed.wait(5)
+
+    thread.join()
+    assert hook.trigger() == ['other']
+    assert hook.handler_count == 1
@@ -1,6 +1,9 @@
+import gc
+import weakref
+
 import pytest
 
-from hookery import ClassHook, hookable
+from hookery import ClassHook, base, hookable
 
 
 def test_cannot_be_used_outside_class():
@@ -150,3 +153,125 @@ def test_can_stack_handlers():
 
     assert B.before.trigger() == ['Hello', 'Hi']
     assert B.after.trigger() == ['Hello', 'Hi']
+
+
+def test_handlers_registered_in_hook_declaring_class_are_not_duplicated_in_subclasses():
+    @hookable
+    class C:
+        before = ClassHook()
+
+        @before
+        def greeting(cls):
+            return 'Hello'
+
+    class D(C):
+        pass
+
+    assert C.before.trigger() == ['Hello']
+    assert D.before.trigger() == ['Hello']
+
+
+def test_subclass_hooks_share_inherited_handlers():
+    @hookable
+    class C:
+        before = ClassHook()
+
+        @before
+        def greeting(cls):
+            return 'Hello'
+
+    subclasses = [type('D{}'.format(i), (C,), {}) for i in range(100)]
+
+    assert all(D.before.trigger() == ['Hello'] for D in subclasses)
+    assert all(D.before._get_raw_handlers() is C.before._get_raw_handlers() for D in subclasses)
+    assert all(D.before._cached_handlers is None for D in subclasses)
+
+    class E(subclasses[0]):
+        pass
+
+    E.before(lambda: 'E')
+    assert E.before.trigger() == ['Hello', 'E']
+    assert E.before._get_raw_handlers()[:1] == C.before._get_raw_handlers()
+
+
+def test_handlers_registered_with_parent_after_trigger_are_inherited():
+    @hookable
+    class C:
+        before = ClassHook()
+
+    class D(C):
+        pass
+
+    D.before(lambda: 'D')
+    assert D.before.trigger() == ['D']
+
+    C.before(lambda: 'C')
+    assert D.before.trigger() == ['C', 'D']
+
+
+def test_failed_class_body_does_not_register_handlers():
+    @hookable
+    class B:
+        before = ClassHook()
+
+    with pytest.raises(RuntimeError):
+        class C(B):
+            @B.before
+            def before(self):
+                pass
+
+    assert not B.before
+
+
+def test_registration_after_class_body_raised_is_not_deferred():
+    @hookable
+    class B:
+        before = ClassHook()
+
+    with pytest.raises(ZeroDivisionError):
+        class C(B):
+            1 / 0
+
+    def handler():
+        return 'b'
+
+    B.before(handler)
+    assert B.before.trigger() == ['b']
+
+    class D(B):
+        @B.before
+        def own(cls):
+            return 'd'
+
+    assert B.before.trigger() == ['b']
+    assert D.before.trigger() == ['b', 'd']
+
+
+def test_failed_class_body_does_not_retain_locals_of_enclosing_frame():
+    @hookable
+    class B:
+        before = ClassHook()
+
+    class Big:
+        pass
+
+    def create_failing_class(big):
+        with pytest.raises(ZeroDivisionError):
+            class C(B):
+                1 / 0
+
+    big = Big()
+    big_ref = weakref.ref(big)
+    create_failing_class(big)
+    del big
+    gc.collect()
+    assert big_ref() is None
+
+    class D(B):
+        @B.before
+        def own(cls):
+            return 'd'
+
+    assert B.before.trigger() == []
+    assert D.before.trigger() == ['d']
+    assert not base._class_bodies.stack
@@ -0,0 +1,86 @@
+import threading
+
+from hookery import Hook, InstanceHook, hookable
+
+
+def test_handlers_is_immutable_snapshot():
+    hook = Hook()
+    hook(lambda: 1)
+    handlers = hook.handlers
+    assert isinstance(handlers, tuple)
+
+    hook(lambda: 2)
+    assert len(handlers) == 1
+    assert len(hook.handlers) == 2
+
+
+def test_trigger_sees_consistent_snapshot_while_handlers_change():
+    hook = Hook()
+    hook(lambda: 'first')
+
+    results = []
+
+    def unregistering_handler():
+        hook.unregister_handler(unregistering_handler)
+        hook(lambda: 'late')
+        return 'unregistering'
+
+    hook(unregistering_handler)
+    results.extend(hook.trigger())
+
+    assert results == ['first', 'unregistering']
+    assert hook.trigger() == ['first', 'late']
+
+
+def test_concurrent_register_unregister_and_trigger():
+    @hookable
+    class Record:
+        changed = InstanceHook()
+
+    @Record.changed
+    def always(self):
+        return 'always'
+
+    records = [Record() for _ in range(4)]
+    errors = []
+    stop = threading.Event()
+    num_threads = 8
+    iterations = 300
+
+    def register_and_unregister(index):
+        try:
+            for i in range(iterations):
+                def handler():
+                    return 'temporary'
+                hook = Record.changed if i % 2 else records[index % len(records)].changed
+                hook(handler)
+                hook.unregister_handler(handler)
+        except Exception as e:
+            errors.append(e)
+
+    def trigger():
+        try:
+            while not stop.is_set():
+                for record in records:
+                    results = record.changed.trigger()
+                    assert results[0] == 'always'
+                    assert set(results[1:]) <= {'temporary'}
+                    assert len(record.changed.handlers) >= 1
+        except Exception as e:
+            errors.append(e)
+
+    triggering_threads = [threading.Thread(target=trigger) for _ in range(num_threads)]
+    registering_threads = [threading.Thread(target=register_and_unregister, args=(i,)) for i in range(num_threads)]
+    for thread in triggering_threads + registering_threads:
+        thread.start()
+    for thread in registering_threads:
+        thread.join()
+    stop.set()
+    for thread in triggering_threads:
+        thread.join()
+
+    assert errors == []
+    assert Record.changed.handler_count == 1
+    for record in records:
+        assert record.changed.trigger() == ['always']
+        assert record.changed.handler_count == 1
@@ -0,0 +1,247 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from hookery import Dispatcher, Hook, InstanceHook, ShardedDispatcher, dispatch, hookable
+
+
+def test_trigger_later_runs_handlers_in_dispatcher_thread():
+    hook = Hook(dispatcher=Dispatcher())
+    threads = []
+
+    @hook
+    def handler(x):
+        threads.append(threading.current_thread())
+        return x * 2
+
+    future = hook.trigger_later(x=21)
+    assert future.result(timeout=5) == [42]
+    assert threads[0] is not threading.current_thread()
+    assert hook.dispatcher.close(timeout=5)
+
+
+def test_trigger_later_uses_default_dispatcher():
+    hook = Hook()
+    hook(lambda: 'done')
+    future = hook.trigger_later()
+    assert dispatch.flush(timeout=5)
+    assert future.done()
+    assert future.result() == ['done']
+
+
+def test_hook_dispatcher_is_inherited_by_class_and_instance_hooks():
+    dispatcher = Dispatcher()
+
+    @hookable
+    class Model:
+        saved = InstanceHook(dispatcher=dispatcher)
+
+    @Model.saved
+    def audit(self):
+        return self
+
+    m = Model()
+    assert m.saved.dispatcher is dispatcher
+    assert m.saved.trigger_later().result(timeout=5) == [m]
+    dispatcher.close(timeout=5)
+
+
+def test_exception_in_handler_is_set_on_future():
+    hook = Hook(dispatcher=Dispatcher())
+
+    @hook
+    def handler():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        hook.trigger_later().result(timeout=5)
+    hook.dispatcher.close(timeout=5)
+
+
+def blocked_hook(dispatcher):
+    """
+    Returns a hook whose first trigger blocks the dispatcher thread until the returned event is set.
+    """
+    hook = Hook(dispatcher=dispatcher)
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    @hook
+    def handler(x):
+        if x == 'block':
+            started.set()
+            release.wait(timeout=5)
+        results.append(x)
+
+    hook.trigger_later(x='block')
+    assert started.wait(timeout=5)
+    return hook, release, results
+
+
+def test_drop_newest():
+    dispatcher = Dispatcher(maxsize=2, overflow='drop_newest')
+    hook, release, results = blocked_hook(dispatcher)
+
+    f1 = hook.trigger_later(x=1)
+    f2 = hook.trigger_later(x=2)
+    f3 = hook.trigger_later(x=3)
+    assert f3.cancelled()
+
+    release.set()
+    assert dispatcher.flush(timeout=5)
+    assert results == ['block', 1, 2]
+    assert f1.done() and f2.done()
+    with pytest.raises(CancelledError):
+        f3.result()
+
+
+def test_drop_oldest():
+    dispatcher = Dispatcher(maxsize=2, overflow='drop_oldest')
+    hook, release, results = blocked_hook(dispatcher)
+
+    f1 = hook.trigger_later(x=1)
+    hook.trigger_later(x=2)
+    hook.trigger_later(x=3)
+    assert f1.cancelled()
+
+    release.set()
+    assert dispatcher.flush(timeout=5)
+    assert results == ['block', 2, 3]
+
+
+def test_block():
+    dispatcher = Dispatcher(maxsize=1, overflow='block')
+    hook, release, results = blocked_hook(dispatcher)
+
+    hook.trigger_later(x=1)
+
+    submitted = threading.Event()
+
+    def submit():
+        hook.trigger_later(x=2)
+        submitted.set()
+
+    thread = threading.Thread(target=submit)
+    thread.start()
+    assert not submitted.wait(timeout=0.1)
+
+    release.set()
+    assert submitted.wait(timeout=5)
+    thread.join()
+    assert dispatcher.close(timeout=5)
+    assert results == ['block', 1, 2]
+
+
+def test_block_in_dispatcher_thread_triggers_event_right_away():
+    dispatcher = Dispatcher(maxsize=1, overflow='block')
+    results = []
+    inner = Hook(dispatcher=dispatcher)
+    inner(lambda x: results.append(x))
+    outer = Hook(dispatcher=dispatcher)
+
+    @outer
+    def handler():
+        futures = [inner.trigger_later(x=x) for x in range(3)]
+        results.append('outer')
+        return futures
+
+    future = outer.trigger_later()
+    assert dispatcher.flush(timeout=2)
+    assert all(f.done() for f in future.result()[0])
+    assert sorted(results, key=str) == [0, 1, 2, 'outer']
+    assert dispatcher.stats()[0].processed == 4
+    assert dispatcher.close(timeout=5)
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        Dispatcher(overflow='explode')
+
+
+def test_closed_dispatcher_rejects_events():
+    dispatcher = Dispatcher()
+    dispatcher.close()
+    with pytest.raises(RuntimeError):
+        Hook(dispatcher=dispatcher).trigger_later()
+
+
+def test_sharded_dispatcher_keeps_order_per_subject():
+    dispatcher = ShardedDispatcher(shards=3)
+
+    @hookable
+    class Document:
+        changed = InstanceHook(dispatcher=dispatcher)
+
+        def __init__(self):
+            self.seen = []
+
+    @Document.changed
+    def record(self, version):
+        self.seen.append((version, threading.current_thread().name))
+
+    documents = [Document() for _ in range(6)]
+    for version in range(20):
+        for document in documents:
+            document.changed.trigger_later(version=version)
+
+    assert dispatcher.close(timeout=5)
+
+    for document in documents:
+        assert [version for version, _ in document.seen] == list(range(20))
+        assert len({thread_name for _, thread_name in document.seen}) == 1
+
+    stats = dispatcher.stats()
+    assert len(stats) == 3
+    assert sum(s.processed for s in stats) == 120
+    assert all(s.depth == 0 and s.lag == 0.0 for s in stats)
+
+
+def test_sharded_dispatcher_with_custom_key():
+    dispatcher = ShardedDispatcher(shards=2, key=lambda hook, kwargs: kwargs['user'])
+    hook = Hook(dispatcher=dispatcher)
+    threads = {}
+    hook(lambda user: threads.setdefault(user, set()).add(threading.current_thread().name))
+
+    for _ in range(5):
+        for user in ('a', 'b', 'c'):
+            hook.trigger_later(user=user)
+
+    assert dispatcher.close(timeout=5)
+    assert all(len(names) == 1 for names in threads.values())
+
+
+def test_shard_stats_report_depth_and_lag():
+    dispatcher = ShardedDispatcher(shards=1)
+    hook, release, results = blocked_hook(dispatcher)
+
+    hook.trigger_later(x=1)
+    hook.trigger_later(x=2)
+
+    stats, = dispatcher.stats()
+    assert stats.depth == 2
+    assert stats.lag > 0
+
+    release.set()
+    assert dispatcher.flush(timeout=5)
+    stats, = dispatcher.stats()
+    assert stats == (0, 0.0, 3)
+
+
+def test_close_stops_all_shards_when_one_times_out():
+    dispatcher = ShardedDispatcher(shards=3, key=lambda hook, kwargs: 0 if kwargs['x'] == 'block' else kwargs['x'])
+    hook, release, results = blocked_hook(dispatcher)
+
+    started = time.monotonic()
+    assert not dispatcher.close(timeout=0.2)
+    assert time.monotonic() - started < 1
+
+    for x in (1, 2):
+        with pytest.raises(RuntimeError):
+            hook.trigger_later(x=x)
+
+    release.set()
+    assert dispatcher.flush(timeout=5)
+    assert results == ['block']
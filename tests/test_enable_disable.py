@@ -0,0 +1,162 @@
+from hookery import ClassHook, Hook, InstanceHook, hookable
+
+
+def test_disabled_hook_returns_without_calling_handlers():
+    calls = []
+    hook = Hook(args=('x',))
+    hook(lambda x: calls.append(x))
+
+    hook.disable()
+    assert hook.trigger(x=1) == []
+    assert hook.fire(2) == []
+    assert calls == []
+    assert hook.handler_count == 1
+
+    hook.enable()
+    assert hook.trigger(x=3) == [None]
+    assert calls == [3]
+
+
+def test_disabled_hook_is_falsy():
+    @hookable
+    class Document:
+        saved = InstanceHook()
+
+    Document.saved(lambda: None)
+    document = Document()
+    assert Document.saved
+    assert document.saved
+
+    Document.saved.disable()
+    assert not Document.saved
+    assert not document.saved
+
+    Document.saved.enable()
+    assert document.saved
+
+
+def test_disabled_single_handler_and_around_hooks_return_none():
+    single = Hook(single_handler=True)
+    single(lambda: 'result')
+    single.disable()
+    assert single.trigger() is None
+
+    around = Hook(around=True)
+    around(lambda call_next: 'result')
+    around.disable()
+    assert around.trigger() is None
+
+
+def test_disabling_class_hook_disables_instance_hooks():
+    @hookable
+    class Document:
+        saved = InstanceHook()
+
+    @Document.saved
+    def on_saved(self):
+        return 'saved'
+
+    document = Document()
+
+    @document.saved
+    def on_document_saved():
+        return 'document saved'
+
+    Document.saved.disable()
+    assert document.saved.trigger() == []
+
+    Document.saved.enable()
+    document.saved.disable()
+    assert document.saved.trigger() == []
+    assert Document().saved.trigger() == ['saved']
+
+
+def test_muted_handler_is_skipped_and_keeps_its_position():
+    hook = Hook()
+    hook(lambda: 1)
+    second = hook(lambda: 2)
+    hook(lambda: 3)
+
+    second.mute()
+    assert hook.trigger() == [1, 3]
+
+    second.unmute()
+    assert hook.trigger() == [1, 2, 3]
+
+
+def test_handler_can_be_muted_through_bound_handler():
+    hook = Hook()
+    hook(lambda: 1)
+    hook(lambda: 2)
+
+    hook.handlers[0].mute()
+    assert hook.trigger() == [2]
+    assert hook.handlers[0].muted
+
+
+def test_muting_handler_invalidates_memoized_results():
+    hook = Hook(memoize=True)
+    hook(lambda x: 'first')
+    second = hook(lambda x: 'second')
+
+    assert hook.trigger(x=1) == ['first', 'second']
+
+    second.mute()
+    assert hook.trigger(x=1) == ['first']
+
+    second.unmute()
+    assert hook.trigger(x=1) == ['first', 'second']
+    assert hook.trigger(x=1) == ['first', 'second']
+    assert hook.cache_info().hits == 1
+
+
+def test_handler_registered_in_class_body_can_be_muted():
+    @hookable
+    class C:
+        before = ClassHook()
+
+        @before
+        def greeting(cls):
+            return 'Hello'
+
+    class D(C):
+        pass
+
+    C.greeting.mute()
+    assert C.before.trigger() == []
+    assert D.before.trigger() == []
+
+    C.greeting.unmute()
+    assert D.before.trigger() == ['Hello']
+
+
+def test_disabling_class_hook_disables_hooks_of_subclasses_and_their_instances():
+    @hookable
+    class Base:
+        h = InstanceHook()
+        c = ClassHook()
+
+    Base.h(lambda: 'h')
+    Base.c(lambda: 'c')
+
+    class Sub(Base):
+        pass
+
+    sub = Sub()
+    assert sub.h.trigger() == ['h']
+
+    Base.h.disable()
+    Base.c.disable()
+    assert sub.h.trigger() == []
+    assert Sub().h.trigger() == []
+    assert Sub.c.trigger() == []
+
+    Sub.h.disable()
+    Base.h.enable()
+    Base.c.enable()
+    assert sub.h.trigger() == []
+    assert Sub.c.trigger() == ['c']
+
+    Sub.h.enable()
+    assert sub.h.trigger() == ['h']
+    assert sub.h.fire() == ['h']
@@ -27,3 +27,36 @@ def test_handler_of_handler_uses_original_func_as_original_func():
 
     assert handler2._original_func is f
     assert handler1._original_func is f
+
+
+def test_function_is_introspected_and_wrapped_once(monkeypatch):
+    import inspect
+
+    calls = []
+    signature = inspect.signature
+
+    def counting_signature(func):
+        calls.append(func)
+        return signature(func)
+
+    monkeypatch.setattr(inspect, 'signature', counting_signature)
+
+    def f(a, b):
+        return a * b
+
+    hooks = [Hook('hook{}'.format(i), args=['a', 'b']) for i in range(5)]
+    handlers = [Handler(f, hook) for hook in hooks]
+
+    assert calls == [f]
+    assert all(h._optional_args_func is handlers[0]._optional_args_func for h in handlers)
+    assert handlers[3](a=2, b=3, c=4) == 6
+
+
+def test_bound_method_handler_is_introspected_without_cache():
+    class Multiplier:
+        def multiply(self, a, b):
+            return a * b
+
+    m = Multiplier()
+    h = Handler(m.multiply, Hook('hook'))
+    assert h(a=2, b=5) == 10
@@ -132,3 +132,33 @@ def test_hook_with_consume_generators_false():
     assert isinstance(results, list)
     assert inspect.isgenerator(results[0])
     assert inspect.isgenerator(results[1])
+
+
+def test_emptiness_check_does_not_resolve_handlers():
+    @hookable
+    class Base:
+        before = InstanceHook()
+
+    class Derived(Base):
+        pass
+
+    d = Derived()
+    assert not d.before
+    assert d.before.handler_count == 0
+
+    Base.before(lambda: 1)
+    assert d.before
+    assert d.before.handler_count == 1
+
+    d.before(lambda: 2)
+    Derived.before(lambda: 3)
+    assert d.before.handler_count == 3
+    assert Derived.before.handler_count == 2
+    assert Base.before.handler_count == 1
+    assert d.before._cached_raw_handlers is None
+    assert d.before._cached_handlers is None
+
+    Base.before.unregister_handler(Base.before._direct_handlers[0])
+    assert d.before.handler_count == 2
+    assert Derived().before.handler_count == 1
+    assert d.before.trigger() == [3, 2]
@@ -51,3 +51,81 @@ def test_further_descendant():
 
     assert PositiveInteger.parser
     assert PositiveInteger().parser.trigger(value='-55') == 55
+
+
+def test_handlers_registered_in_class_body_do_not_touch_parent_class_hook():
+    @hookable
+    class Field:
+        parser = InstanceHook()
+
+    parent_hook = Field.parser
+    field = Field()
+    raw_handlers = field.parser._get_raw_handlers()
+
+    class Integer(Field):
+        @Field.parser
+        def parse(self, value):
+            return int(value)
+
+    assert parent_hook._version == 0
+    assert field.parser._get_raw_handlers() is raw_handlers
+    assert Integer.parser.has_handler(Integer.parse)
+    assert Integer().parser.trigger(value='5') == [5]
+
+
+def test_stacked_handlers_registered_in_class_body_are_own():
+    @hookable
+    class Field:
+        before = InstanceHook()
+        after = InstanceHook()
+
+    class Integer(Field):
+        @Field.before
+        @Field.after
+        def greeting(self):
+            return 'Hello'
+
+    assert not Field.before
+    assert not Field.after
+    assert Integer().before.trigger() == ['Hello']
+    assert Integer().after.trigger() == ['Hello']
+
+
+def test_handlers_registered_in_class_body_but_not_kept_stay_with_parent_class_hook():
+    @hookable
+    class Field:
+        parser = InstanceHook()
+
+    def parse(self, value):
+        return value
+
+    class Integer(Field):
+        Field.parser(parse)
+
+    assert Field.parser.has_handler(parse)
+    assert Integer().parser.trigger(value=1) == [1]
+
+
+def test_handlers_of_class_created_without_class_statement_are_own():
+    @hookable
+    class Field:
+        parser = InstanceHook()
+
+    def parse(self, value):
+        return int(value)
+
+    Integer = type('Integer', (Field,), {'parse': Field.parser(parse)})
+
+    assert not Field.parser
+    assert Integer().parser.trigger(value='5') == [5]
+
+
+def test_hookable_returns_hookable_class_unchanged():
+    @hookable
+    class Field:
+        parser = InstanceHook()
+
+    class Integer(Field):
+        pass
+
+    assert hookable(Integer) is Integer
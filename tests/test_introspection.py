@@ -0,0 +1,67 @@
+import gc
+
+from hookery import ClassHook, Hook, InstanceHook, hookable, introspection
+
+
+def test_live_hooks_are_tracked_weakly():
+    hook = Hook('temporary')
+    assert hook in introspection.live_hooks()
+
+    del hook
+    gc.collect()
+    assert all(h.name != 'temporary' for h in introspection.live_hooks())
+
+
+def test_report_groups_hooks_by_defining_class_and_subject_kind():
+    @hookable
+    class Model:
+        saved = InstanceHook()
+        created = ClassHook()
+
+        @saved
+        def audit(self):
+            pass
+
+    class User(Model):
+        pass
+
+    users = [User() for _ in range(5)]
+    for user in users:
+        user.saved(lambda: None)
+        user.saved.trigger()
+    User.created.trigger()
+
+    groups = {(r.defining_class, r.kind): r for r in introspection.report()}
+
+    instance_group = groups[(Model, introspection.INSTANCE)]
+    assert instance_group.hooks == 5
+    assert instance_group.names == ('saved',)
+    assert instance_group.direct_handlers == 5
+    # each instance hook caches its own tuple of the inherited handler plus its own handler
+    assert instance_group.cached_handlers == 10
+    assert instance_group.retained_bytes > 0
+
+    class_group = groups[(Model, introspection.CLASS)]
+    assert class_group.names == ('created', 'saved')
+    assert class_group.direct_handlers == 1
+
+    text = introspection.format_report()
+    assert 'Model' in text
+    assert 'instance' in text
+
+
+def test_shared_handler_caches_are_not_counted():
+    @hookable
+    class Base:
+        before = ClassHook()
+
+        @before
+        def handler(cls):
+            pass
+
+    class Derived(Base):
+        pass
+
+    Derived.before.trigger()
+    assert introspection.cached_handlers_count(Base.before) == 1
+    assert introspection.cached_handlers_count(Derived.before) == 0
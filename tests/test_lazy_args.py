@@ -0,0 +1,86 @@
+from hookery import EveryNth, Hook, InstanceHook, Lazy, hookable
+
+
+def test_needed_args_is_union_of_handler_parameters():
+    @hookable
+    class Document:
+        saved = InstanceHook()
+
+        @saved
+        def audit(self, user):
+            pass
+
+    doc = Document()
+    assert doc.saved.needed_args == {'self', 'user'}
+
+    doc.saved(lambda diff, user: None)
+    assert doc.saved.needed_args == {'self', 'user', 'diff'}
+
+    Document.saved(lambda payload: None)
+    assert doc.saved.needed_args == {'self', 'user', 'diff', 'payload'}
+    assert Hook().needed_args == frozenset()
+
+
+def test_lazy_value_is_evaluated_only_if_needed():
+    hook = Hook()
+    evaluated = []
+
+    def payload():
+        evaluated.append('payload')
+        return 'serialized'
+
+    hook(lambda user: user)
+    assert hook.trigger(user='u', payload=Lazy(payload)) == ['u']
+    assert evaluated == []
+
+    hook(lambda payload: payload)
+    hook(lambda payload, user: (payload, user))
+    assert hook.trigger(user='u', payload=Lazy(payload)) == ['u', 'serialized', ('serialized', 'u')]
+    assert evaluated == ['payload']
+
+
+def test_lazy_value_is_evaluated_at_most_once_across_hooks():
+    calls = []
+    value = Lazy(lambda: calls.append(1) or 42)
+
+    h1 = Hook()
+    h1(lambda x: x)
+    h2 = Hook()
+    h2(lambda x: x + 1)
+
+    assert h1.trigger(x=value) == [42]
+    assert h2.trigger(x=value) == [43]
+    assert calls == [1]
+    assert repr(value) == 'Lazy(value=42)'
+
+
+def test_triggers_with_lazy_values_bypass_memoize():
+    hook = Hook(memoize=True, memoize_maxsize=2)
+    hook(lambda x, payload: (x, payload))
+
+    assert hook.trigger(x=1, payload='a') == [(1, 'a')]
+    for i in range(5):
+        assert hook.trigger(x=2, payload=Lazy(lambda: i)) == [(2, i)]
+
+    assert hook.trigger(x=1, payload='a') == [(1, 'a')]
+    info = hook.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_lazy_value_is_not_evaluated_for_handlers_that_are_not_called():
+    evaluated = []
+    payload = Lazy(lambda: evaluated.append('payload') or 'serialized')
+
+    hook = Hook()
+    hook(lambda user: user)
+    hook(lambda payload: payload).mute()
+    hook.register_handler(lambda payload: payload, sampler=EveryNth(2))
+    hook.handlers[2].sampler()
+    assert hook.trigger(user='u', payload=payload) == ['u']
+
+    single = Hook(single_handler=True)
+    single(lambda payload: payload)
+    single(lambda user: user)
+    assert single.trigger(user='u', payload=payload) == 'u'
+
+    assert evaluated == []
@@ -0,0 +1,104 @@
+import sys
+
+import pytest
+
+from hookery import HandlerReference, Hook, InstanceHook, hookable, loading
+
+PLUGIN = 'tests.lazy_plugin'
+
+
+@pytest.fixture
+def unimported_plugin():
+    sys.modules.pop(PLUGIN, None)
+    yield
+    sys.modules.pop(PLUGIN, None)
+
+
+def test_handler_registered_by_reference_is_imported_on_first_trigger(unimported_plugin):
+    hook = Hook(args=('name',))
+    hook(lambda name: 'first {}'.format(name))
+    reference = hook.register_handler(PLUGIN + ':on_saved')
+
+    assert isinstance(reference, HandlerReference)
+    assert PLUGIN not in sys.modules
+    assert hook
+    assert hook.handler_count == 2
+
+    assert hook.trigger(name='x') == ['first x', 'saved x']
+    assert PLUGIN in sys.modules
+
+    raw_handlers = hook._get_raw_handlers()
+    assert not any(isinstance(h, HandlerReference) for h in raw_handlers)
+    assert hook.trigger(name='y') == ['first y', 'saved y']
+    assert hook._get_raw_handlers() is raw_handlers
+
+
+def test_reference_to_attribute_path():
+    hook = Hook()
+    hook.register_handler(PLUGIN + ':Handlers.on_saved')
+    assert hook.trigger(name='x') == ['Handlers saved x']
+
+
+def test_invalid_references():
+    with pytest.raises(ValueError):
+        loading.import_reference('no_colon')
+
+    hook = Hook()
+    hook.register_handler('tests.no_such_module:handler')
+    with pytest.raises(ImportError):
+        hook.trigger()
+
+
+def test_handler_loaded_by_reference_is_validated_against_hook_args_and_retried():
+    hook = Hook(args=('name',))
+    hook.register_handler(PLUGIN + ':on_saved')
+    hook.register_handler(PLUGIN + ':invalid')
+
+    with pytest.raises(RuntimeError):
+        hook.trigger(name='x')
+
+    # Nothing is loaded if any reference fails.
+    assert hook.handler_count == 2
+    assert all(isinstance(h, HandlerReference) for h in hook._direct_handlers)
+
+    hook.unregister_handler(hook._direct_handlers[1])
+    assert hook.trigger(name='x') == ['saved x']
+
+
+def test_references_registered_with_class_hook_are_loaded_for_instances(unimported_plugin):
+    @hookable
+    class Document:
+        saved = InstanceHook(args=('name',))
+
+    Document.saved.register_handler(PLUGIN + ':on_saved')
+    document = Document()
+
+    assert document.saved
+    assert PLUGIN not in sys.modules
+    assert document.saved.trigger(name='doc') == ['saved doc']
+    assert Document.saved.handler_count == 1
+
+
+def test_entry_points_are_loaded_on_first_trigger(monkeypatch):
+    from importlib.metadata import EntryPoint
+
+    loaded_groups = []
+
+    def iter_entry_points(group):
+        loaded_groups.append(group)
+        return [
+            EntryPoint(name='deleted', value=PLUGIN + ':on_deleted', group=group),
+            EntryPoint(name='saved', value=PLUGIN + ':on_saved', group=group),
+        ]
+
+    monkeypatch.setattr(loading, 'iter_entry_points', iter_entry_points)
+
+    hook = Hook(args=('name',))
+    hook.register_entry_points('myapp.handlers')
+    assert loaded_groups == []
+    assert hook.handler_count == 1
+
+    assert hook.trigger(name='x') == ['deleted x', 'saved x']
+    assert hook.trigger(name='y') == ['deleted y', 'saved y']
+    assert loaded_groups == ['myapp.handlers']
+    assert hook.handler_count == 2
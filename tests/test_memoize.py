@@ -0,0 +1,110 @@
+from hookery import ClassHook, Hook, InstanceHook, hookable
+
+
+def test_memoize_hook_caches_results_by_kwargs():
+    hook = Hook(memoize=True)
+    calls = []
+
+    @hook
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert hook.trigger(x=3) == [9]
+    assert hook.trigger(x=3) == [9]
+    assert hook.trigger(x=4) == [16]
+    assert calls == [3, 4]
+
+    info = hook.cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+    assert info.maxsize == 128
+    assert info.currsize == 2
+
+    hook.cache_clear()
+    assert hook.cache_info() == (0, 0, 128, 0)
+
+
+def test_changing_returned_results_does_not_change_memoized_results():
+    hook = Hook(memoize=True)
+    hook(lambda x: x * 2)
+
+    first = hook.trigger(x=1)
+    first.append('changed')
+    second = hook.trigger(x=1)
+    assert second == [2]
+    second.clear()
+    assert hook.trigger(x=1) == [2]
+    assert hook.cache_info().hits == 2
+
+
+def test_memoize_evicts_least_recently_used():
+    hook = Hook(memoize=True, memoize_maxsize=2)
+    calls = []
+    hook(lambda x: calls.append(x))
+
+    hook.trigger(x=1)
+    hook.trigger(x=2)
+    hook.trigger(x=1)
+    hook.trigger(x=3)  # evicts x=2
+    hook.trigger(x=1)
+    hook.trigger(x=2)
+
+    assert calls == [1, 2, 3, 2]
+    assert hook.cache_info().currsize == 2
+
+
+def test_memoize_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('hookery.base.time.monotonic', lambda: now[0])
+
+    hook = Hook(memoize=True, memoize_ttl=10)
+    calls = []
+    hook(lambda x: calls.append(x))
+
+    hook.trigger(x=1)
+    now[0] += 5
+    hook.trigger(x=1)
+    assert calls == [1]
+
+    now[0] += 10
+    hook.trigger(x=1)
+    assert calls == [1, 1]
+
+
+def test_unhashable_kwargs_are_not_memoized():
+    hook = Hook(memoize=True)
+    calls = []
+    hook(lambda x: calls.append(x))
+
+    hook.trigger(x=[1])
+    hook.trigger(x=[1])
+    assert calls == [[1], [1]]
+    assert hook.cache_info().currsize == 0
+
+
+def test_memoize_cache_is_invalidated_when_handlers_change_anywhere_in_hierarchy():
+    @hookable
+    class Base:
+        compute = InstanceHook(memoize=True)
+        schema = ClassHook(memoize=True)
+
+    class Derived(Base):
+        pass
+
+    d = Derived()
+    assert d.compute.memoize
+
+    assert d.compute.trigger(x=1) == []
+    assert Derived.schema.trigger(x=1) == []
+
+    Base.compute(lambda x: x + 1)
+    Base.schema(lambda x: x + 2)
+    assert d.compute.trigger(x=1) == [2]
+    assert Derived.schema.trigger(x=1) == [3]
+
+    Derived.compute(lambda x: x + 10)
+    assert d.compute.trigger(x=1) == [2, 11]
+
+    Base.compute.unregister_handler(Base.compute._direct_handlers[0])
+    assert d.compute.trigger(x=1) == [11]
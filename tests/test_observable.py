@@ -0,0 +1,158 @@
+import pytest
+
+from hookery import Hookable, ObservableAttr, deferred, hookable, introspection, recording
+from hookery.recording import FlightRecorder
+
+
+@hookable
+class Address:
+    city = ObservableAttr()
+    country = ObservableAttr(default='UK')
+
+
+def test_observable_attr_stores_values():
+    address = Address()
+    assert address.city is None
+    assert address.country == 'UK'
+
+    address.city = 'London'
+    assert address.city == 'London'
+    assert address.__dict__['city'] == 'London'
+    assert isinstance(Address.city, ObservableAttr)
+
+
+def test_unobserved_assignment_does_not_create_instance_hook():
+    address = Address()
+    address.city = 'London'
+    assert Address.city_changed.name == 'city_changed'
+    assert '_instance_hook#city_changed' not in address.__dict__
+
+
+def test_change_hook_receives_old_and_new_values():
+    class Office(Address):
+        pass
+
+    changes = []
+
+    @Office.city_changed
+    def on_city_changed(self, attr, old, new):
+        changes.append((self, attr, old, new))
+
+    office = Office()
+    office.city = 'London'
+    office.country = 'Latvia'
+    office.city = 'Riga'
+
+    assert changes == [
+        (office, 'city', None, 'London'),
+        (office, 'city', 'London', 'Riga'),
+    ]
+
+
+def test_change_hook_only_fires_when_value_changes():
+    address = Address()
+    changes = []
+    address.country_changed(lambda old, new: changes.append((old, new)))
+
+    address.country = 'UK'
+    address.country = 'Latvia'
+    address.country = 'Latvia'
+
+    assert changes == [('UK', 'Latvia')]
+    assert Address().country_changed.trigger(old=1, new=2) == []
+
+
+def test_slot_storage():
+    class Point(Hookable):
+        __slots__ = ('_x', '_y')
+
+        x = ObservableAttr(default=0, slot='_x')
+        y = ObservableAttr(default=0, slot='_y')
+
+    class ObservedPoint(Point):
+        __slots__ = ()
+
+    changes = []
+    ObservedPoint.x_changed(lambda self, attr, new: changes.append((self, attr, new)))
+
+    p = Point()
+    assert not hasattr(p, '__dict__')
+    assert p.x == 0
+    p.x = 5
+    p.y = 6
+    assert (p.x, p.y) == (5, 6)
+
+    op = ObservedPoint()
+    op.x = 3
+    op.y = 4
+    assert changes == [(op, 'x', 3)]
+
+
+def test_slot_storage_without_dict_does_not_create_hooks():
+    class Point(Hookable):
+        __slots__ = ('_x',)
+
+        x = ObservableAttr(default=0, slot='_x')
+
+    changes = []
+    Point.x_changed(lambda self, old, new: changes.append((self, old, new)))
+
+    p = Point()
+    hook_count = len(introspection.live_hooks())
+    p.x = 1
+    p.x = 1
+    p.x = 2
+    assert len(introspection.live_hooks()) == hook_count
+    assert changes == [(p, 0, 1), (p, 1, 2)]
+
+    Point.x_changed.disable()
+    p.x = 3
+    assert len(changes) == 2
+
+
+class SlotPoint(Hookable):
+    __slots__ = ('_x',)
+
+    x = ObservableAttr(default=0, slot='_x')
+
+
+class DictPoint(Hookable):
+    x = ObservableAttr(default=0)
+
+
+@pytest.mark.parametrize('point_cls', [SlotPoint, DictPoint])
+def test_changes_are_batched_and_scoped_with_or_without_dict(point_cls):
+    class Point(point_cls):
+        __slots__ = ()
+
+    changes = []
+    Point.x_changed(lambda self, old, new: changes.append((self, old, new)))
+    p, q = Point(), Point()
+
+    with deferred():
+        p.x = 1
+        q.x = 5
+        p.x = 2
+        assert changes == []
+    assert changes == [(p, 1, 2), (q, 0, 5)]
+
+    scoped = []
+    with Point.x_changed.scoped(lambda self, new: scoped.append((self, new))):
+        p.x = 3
+    p.x = 4
+    assert scoped == [(p, 3)]
+    assert changes[-2:] == [(p, 2, 3), (p, 3, 4)]
+
+
+def test_changes_of_instances_without_dict_are_recorded():
+    recorder = recording.enable(FlightRecorder())
+    try:
+        class Point(SlotPoint):
+            __slots__ = ()
+
+        Point.x_changed(lambda new: None)
+        Point().x = 1
+    finally:
+        recording.disable()
+
+    assert [(r.hook, r.arg_keys) for r in recorder.records()] == [(Point.x_changed, ('attr', 'old', 'new', 'self'))]
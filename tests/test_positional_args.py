@@ -0,0 +1,137 @@
+import pytest
+
+from hookery import ClassHook, Hook, InstanceHook, Lazy, hookable
+
+
+def test_fire_passes_declared_args_positionally():
+    hook = Hook(args=('field', 'source', 'target'))
+
+    @hook
+    def all_args(field, source, target):
+        return field, source, target
+
+    @hook
+    def some_args(target, field):
+        return target, field
+
+    @hook
+    def no_args():
+        return 'none'
+
+    assert hook.fire('f', 's', 't') == [('f', 's', 't'), ('t', 'f'), 'none']
+    assert hook.trigger('f', 's', 't') == [('f', 's', 't'), ('t', 'f'), 'none']
+    assert hook.trigger('f', 's', target='t') == [('f', 's', 't'), ('t', 'f'), 'none']
+
+
+def test_fire_checks_number_of_args():
+    hook = Hook(args=('a', 'b'))
+    with pytest.raises(TypeError):
+        hook.fire(1)
+    with pytest.raises(TypeError):
+        hook.trigger(1, 2, 3)
+    with pytest.raises(TypeError):
+        hook.trigger(1, a=2)
+
+
+def test_fire_passes_subject_to_instance_hook_handlers():
+    @hookable
+    class Field:
+        mapped = InstanceHook(args=('value',))
+
+    @Field.mapped
+    def class_handler(self, value):
+        return self, value
+
+    field = Field()
+
+    @field.mapped
+    def instance_handler(value):
+        return value * 2
+
+    assert field.mapped.fire(3) == [(field, 3), 6]
+    assert field.mapped._get_positional_plan() is not None
+
+
+def test_fire_uses_positional_plan_and_skips_muted_handlers():
+    hook = Hook(args=('x',))
+    first = hook(lambda x: x + 1)
+    hook(lambda x: x + 2)
+
+    assert hook.fire(1) == [2, 3]
+    assert hook._get_positional_plan() is hook._get_positional_plan()
+
+    first.muted = True
+    assert hook.fire(1) == [3]
+
+
+def test_fire_consumes_generators_and_respects_single_handler():
+    hook = Hook(args=('n',))
+
+    @hook
+    def numbers(n):
+        yield from range(n)
+
+    assert hook.fire(3) == [[0, 1, 2]]
+
+    single = Hook(args=('n',), single_handler=True)
+    single(lambda n: n)
+    single(lambda n: -n)
+    assert single.fire(5) == -5
+
+
+def test_fire_falls_back_to_trigger_when_handlers_cannot_be_called_positionally():
+    hook = Hook(args=('a', 'b'))
+
+    @hook
+    def keyword_only(a, *, b):
+        return a, b
+
+    assert hook._get_positional_plan() is None
+    assert hook.fire(1, 2) == [(1, 2)]
+
+
+def test_fire_evaluates_lazy_args():
+    hook = Hook(args=('payload',))
+    hook(lambda payload: payload)
+    assert hook.fire(Lazy(lambda: 'computed')) == ['computed']
+
+
+def test_fire_prevents_recursive_triggering():
+    hook = Hook(args=('x',))
+
+    @hook
+    def recursive(x):
+        return hook.fire(x)
+
+    with pytest.raises(RuntimeError):
+        hook.fire(1)
+
+    assert not hook._is_triggering
+
+
+def test_positional_plan_is_rebuilt_when_handlers_change():
+    hook = Hook(args=('x',))
+    hook(lambda x: x)
+    assert hook.fire(1) == [1]
+    hook(lambda x: -x)
+    assert hook.fire(1) == [1, -1]
+
+
+def test_class_and_instance_hooks_accept_positional_args():
+    @hookable
+    class Field:
+        mapped = InstanceHook(args=('source', 'target'))
+        declared = ClassHook(args=('name',))
+
+    Field.mapped(lambda source, target: (source, target))
+    Field.declared(lambda cls, name: (cls, name))
+
+    assert Field().mapped.trigger('s', 't') == [('s', 't')]
+    assert Field().mapped.trigger('s', target='t') == [('s', 't')]
+    assert Field.declared.trigger('x') == [(Field, 'x')]
+    assert Field.declared.fire('x') == [(Field, 'x')]
+
+    with pytest.raises(TypeError):
+        Field.mapped.fire('s', 't')
+    with pytest.raises(TypeError):
+        Field().declared.fire('x')
@@ -0,0 +1,150 @@
+import io
+
+import pytest
+
+from hookery import ClassHook, Hook, Hookable, InstanceHook, recording, tracing
+from hookery.recording import FlightRecorder
+from hookery.tracing import Tracer
+
+
+@pytest.fixture(autouse=True)
+def disable_recording():
+    yield
+    recording.disable()
+    tracing.disable()
+
+
+class Base(Hookable):
+    before = InstanceHook(args=('x', 'y'))
+    saved = ClassHook()
+
+
+def test_recorder_records_triggers_of_all_hooks():
+    recorder = recording.enable(FlightRecorder())
+    b = Base()
+    b.before(lambda x: x)
+
+    assert b.before.trigger(x=1, y=2) == [1]
+    assert b.before.fire(3, 4) == [3]
+    assert b.before.trigger(5, 6) == [5]
+    Base.saved.trigger()
+
+    records = recorder.records()
+    assert [r.hook for r in records] == [b.before, b.before, b.before, Base.saved]
+    assert [r.subject for r in records] == [b, b, b, Base]
+    assert [r.arg_keys for r in records] == [('x', 'y'), ('x', 'y'), ('x', 'y'), ()]
+    assert all(r.error is None for r in records)
+    assert all(r.duration >= 0 for r in records)
+    assert records[0].timestamp <= records[-1].timestamp
+
+    recording.disable()
+    b.before.trigger(x=1, y=2)
+    assert len(recorder) == 4
+
+
+def test_recorder_keeps_last_triggers():
+    recorder = recording.enable(FlightRecorder(size=3))
+    hook = Hook(args=('i',))
+
+    for i in range(10):
+        hook.trigger(i=i)
+
+    assert len(recorder) == 3
+    recorder.clear()
+    assert recorder.records() == []
+
+
+def test_hook_recorder_is_shared_by_hooks_created_for_subclasses_and_instances():
+    recorder = FlightRecorder()
+
+    class Model(Hookable):
+        saved = InstanceHook(recorder=recorder)
+        created = ClassHook(recorder=recorder)
+
+    class User(Model):
+        pass
+
+    user = User()
+    user.saved.trigger()
+    User.created.trigger()
+    Base().before.trigger(x=1, y=2)
+
+    assert [r.hook for r in recorder.records()] == [user.saved, User.created]
+
+
+def test_trigger_is_recorded_once_by_recorder_of_hook_and_of_all_hooks():
+    recorder = recording.enable(FlightRecorder())
+    hook_recorder = FlightRecorder()
+    hook = Hook(recorder=hook_recorder)
+    hook.trigger()
+
+    assert len(hook_recorder) == 1
+    assert len(recorder) == 1
+
+    recording.enable(hook_recorder)
+    hook.trigger()
+    assert len(hook_recorder) == 2
+
+
+def test_skipped_triggers_are_not_recorded():
+    recorder = recording.enable(FlightRecorder())
+    hook = Hook()
+    hook.disable()
+    hook.trigger()
+    assert len(recorder) == 0
+
+
+def test_error_is_recorded_and_dumped_once():
+    out = io.StringIO()
+    recorder = recording.enable(FlightRecorder(dump_on_error=True, file=out))
+    outer = Hook(name='outer')
+    inner = Hook(name='inner')
+
+    @inner
+    def fail():
+        raise ValueError('boom')
+
+    @outer
+    def trigger_inner():
+        inner.trigger()
+
+    with pytest.raises(ValueError):
+        outer.trigger()
+
+    assert [(r.hook, r.error) for r in recorder.records()] == [
+        (inner, repr(ValueError('boom'))),
+        (outer, repr(ValueError('boom'))),
+    ]
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0] == 'Last 1 hook triggers, oldest first:'
+    assert 'error=ValueError' in lines[1]
+    assert '<Hook NoSubject.inner>' in lines[1]
+
+
+def test_dump():
+    recorder = recording.enable(FlightRecorder())
+    b = Base()
+    b.before.trigger(x=1, y=2)
+    b.before.trigger(x=1)
+
+    out = io.StringIO()
+    recorder.dump(out)
+
+    lines = out.getvalue().splitlines()
+    assert lines[0] == 'Last 2 hook triggers, oldest first:'
+    assert ' ok <InstanceHook Base.before> subject={!r} args=(x, y) thread='.format(b) in lines[1]
+    assert ' ok <InstanceHook Base.before> subject={!r} args=(x) thread='.format(b) in lines[2]
+
+
+def test_recording_traced_triggers():
+    recorder = recording.enable(FlightRecorder())
+    tracer = tracing.enable(Tracer())
+    hook = Hook(args=('x',))
+    hook(lambda x: x)
+
+    assert hook.fire(1) == [1]
+    assert hook.trigger(x=2) == [2]
+    assert len(recorder) == 2
+    assert len(tracer.spans) == 2
@@ -0,0 +1,99 @@
+import pytest
+
+from hookery import EveryNth, Hook, InstanceHook, Probability, TokenBucket, hookable
+from hookery.sampling import SamplingStats
+
+
+def test_every_nth_hook_trigger():
+    sampler = EveryNth(3)
+    hook = Hook(args=('x',), sampler=sampler)
+    hook(lambda x: x)
+
+    results = [hook.trigger(x=i) for i in range(7)]
+
+    assert results == [[0], [], [], [3], [], [], [6]]
+    assert sampler.stats() == SamplingStats(sampled=3, dropped=4)
+
+
+def test_sampled_handler_is_skipped_before_it_is_called():
+    calls = []
+    hook = Hook(args=('x',))
+    hook(lambda x: 'always')
+    hook.register_handler(lambda x: calls.append(x), sampler=EveryNth(2))
+
+    assert hook.trigger(x=1) == ['always', None]
+    assert hook.trigger(x=2) == ['always']
+    assert hook.fire(3) == ['always', None]
+    assert hook.fire(4) == ['always']
+    assert calls == [1, 3]
+
+    handler = hook.handlers[1]
+    assert handler.sampler.stats() == SamplingStats(sampled=2, dropped=2)
+
+
+def test_sampled_out_single_handler_does_not_fall_back_to_previous_handler():
+    hook = Hook(single_handler=True)
+    hook(lambda: 'first')
+    hook.register_handler(lambda: 'last', sampler=EveryNth(2))
+
+    assert [hook.trigger() for _ in range(4)] == ['last', None, 'last', None]
+    assert [hook.fire() for _ in range(4)] == ['last', None, 'last', None]
+
+
+def test_sampled_handler_of_around_hook_is_skipped():
+    hook = Hook(around=True)
+    hook(lambda call_next: 'outer({})'.format(call_next()))
+    hook.register_handler(lambda call_next: 'sampled', sampler=EveryNth(2))
+
+    assert hook.trigger() == 'outer(sampled)'
+    assert hook.trigger() == 'outer(None)'
+
+
+def test_probability():
+    assert all(Probability(1)() for _ in range(100))
+    assert not any(Probability(0)() for _ in range(100))
+
+    sampler = Probability(0.5)
+    for _ in range(1000):
+        sampler()
+    assert sampler.sampled + sampler.dropped == 1000
+    assert 300 < sampler.sampled < 700
+
+    with pytest.raises(ValueError):
+        Probability(2)
+
+
+def test_token_bucket(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('hookery.sampling.time.monotonic', lambda: now[0])
+
+    sampler = TokenBucket(rate=2, burst=3)
+    assert [sampler() for _ in range(5)] == [True, True, True, False, False]
+
+    now[0] += 1
+    assert [sampler() for _ in range(3)] == [True, True, False]
+
+    now[0] += 10
+    assert [sampler() for _ in range(4)] == [True, True, True, False]
+    assert sampler.stats() == SamplingStats(sampled=8, dropped=4)
+
+    sampler.reset()
+    assert sampler.stats() == SamplingStats(sampled=0, dropped=0)
+
+
+def test_hook_sampler_is_shared_by_instances_of_class():
+    sampler = EveryNth(2)
+
+    @hookable
+    class Request:
+        finished = InstanceHook(sampler=sampler)
+
+    @Request.finished
+    def record(self):
+        return 'recorded'
+
+    first, second = Request(), Request()
+    assert first.finished.trigger() == ['recorded']
+    assert second.finished.trigger() == []
+    assert second.finished.trigger() == ['recorded']
+    assert sampler.stats() == SamplingStats(sampled=2, dropped=1)
@@ -0,0 +1,99 @@
+import threading
+
+from hookery import Hook, InstanceHook, hookable
+
+
+def test_scoped_handlers_are_visible_only_within_block():
+    hook = Hook()
+    hook(lambda: 'registered')
+    raw_handlers = hook._get_raw_handlers()
+
+    with hook.scoped(lambda: 'scoped1') as handlers:
+        assert len(handlers) == 1
+        assert hook.trigger() == ['registered', 'scoped1']
+        assert hook.handler_count == 2
+        assert len(hook.handlers) == 2
+
+        with hook.scoped(lambda: 'scoped2'):
+            assert hook.trigger() == ['registered', 'scoped1', 'scoped2']
+
+        assert hook.trigger() == ['registered', 'scoped1']
+
+    assert hook.trigger() == ['registered']
+    assert hook.handler_count == 1
+    assert hook._get_raw_handlers() is raw_handlers
+
+
+def test_scoped_handlers_make_empty_hook_truthy():
+    hook = Hook()
+    assert not hook
+    with hook.scoped(lambda: None):
+        assert hook
+    assert not hook
+
+
+def test_scoped_handlers_are_not_visible_in_other_threads():
+    hook = Hook()
+    entered = threading.Event()
+    release = threading.Event()
+    seen_in_other_thread = []
+
+    def other_thread():
+        entered.wait(timeout=5)
+        seen_in_other_thread.append(hook.trigger())
+        release.set()
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+
+    with hook.scoped(lambda: 'scoped'):
+        entered.set()
+        release.wait(timeout=5)
+        assert hook.trigger() == ['scoped']
+
+    thread.join()
+    assert seen_in_other_thread == [[]]
+
+
+def test_scoped_handlers_of_class_hook_apply_to_instance_hooks():
+    @hookable
+    class Request:
+        before = InstanceHook(args=['path'])
+
+        @before
+        def log(self, path):
+            return 'log ' + path
+
+    request = Request()
+    request.before(lambda path: 'instance ' + path)
+
+    with Request.before.scoped(lambda path: 'scoped ' + path):
+        assert request.before.trigger(path='/') == ['log /', 'instance /', 'scoped /']
+        assert 'path' in request.before.needed_args
+
+    assert request.before.trigger(path='/') == ['log /', 'instance /']
+
+
+def test_scoped_handlers_of_around_hook():
+    hook = Hook(around=True)
+    hook(lambda call_next: 'outer({})'.format(call_next()))
+
+    with hook.scoped(lambda: 'scoped'):
+        assert hook.trigger() == 'outer(scoped)'
+
+    assert hook.trigger() == 'outer(None)'
+
+
+def test_scoped_handlers_bypass_memoize():
+    hook = Hook(memoize=True)
+    hook(lambda x: ('base', x))
+
+    assert hook.trigger(x=1) == [('base', 1)]
+
+    with hook.scoped(lambda x: ('scoped', x)):
+        assert hook.trigger(x=1) == [('base', 1), ('scoped', 1)]
+        assert hook.trigger(x=3) == [('base', 3), ('scoped', 3)]
+
+    assert hook.trigger(x=3) == [('base', 3)]
+    assert hook.trigger(x=1) == [('base', 1)]
+    assert hook.cache_info().hits == 1
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+import hookery
+
+HEAVY_MODULES = ('concurrent.futures', 'contextlib', 'inspect', 'json', 'logging', 'random', 'typing')
+
+
+def modules_imported_by(statement):
+    code = 'import sys; before = set(sys.modules); {}; print(" ".join(sorted(set(sys.modules) - before)))'.format(
+        statement
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(hookery.__file__))))
+    output = subprocess.check_output([sys.executable, '-c', code], env=env, universal_newlines=True)
+    return set(output.split())
+
+
+def test_import_does_not_import_heavy_modules():
+    imported = modules_imported_by('import hookery')
+    assert 'hookery.base' in imported
+    assert not imported.intersection(HEAVY_MODULES)
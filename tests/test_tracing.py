@@ -0,0 +1,110 @@
+import io
+import json
+
+import pytest
+
+from hookery import Hookable, InstanceHook, tracing
+from hookery.tracing import ChromeTraceExporter, JsonLinesExporter, Tracer
+
+
+@pytest.fixture(autouse=True)
+def disable_tracing():
+    yield
+    tracing.disable()
+
+
+class Base(Hookable):
+    before = InstanceHook()
+
+
+def cascade():
+    b1 = Base()
+    b2 = Base()
+
+    @b2.before
+    def handle_b2():
+        return 'b2'
+
+    @b1.before
+    def handle_b1():
+        return b2.before.trigger()
+
+    return b1
+
+
+def test_tracer_records_nested_span_tree():
+    b1 = cascade()
+    tracer = tracing.enable(Tracer())
+
+    assert b1.before.trigger() == [['b2']]
+
+    root, = tracer.spans
+    assert root.kind == 'trigger'
+    assert root.name == '<InstanceHook Base.before>'
+
+    handler_span, = root.children
+    assert handler_span.kind == 'handler'
+    assert handler_span.name == 'handle_b1'
+
+    nested_trigger, = handler_span.children
+    assert nested_trigger.kind == 'trigger'
+    assert [s.name for s in nested_trigger.walk()] == ['<InstanceHook Base.before>', 'handle_b2']
+
+    assert root.duration >= handler_span.duration >= nested_trigger.duration > 0
+
+
+def test_unsampled_triggers_are_not_recorded():
+    b1 = cascade()
+    tracer = tracing.enable(Tracer(sample_rate=0))
+
+    assert b1.before.trigger() == [['b2']]
+    assert tracer.spans == []
+    assert not tracer.is_recording()
+
+
+def test_errors_are_recorded():
+    b = Base()
+
+    @b.before
+    def fail():
+        raise ValueError('boom')
+
+    tracer = tracing.enable(Tracer())
+    with pytest.raises(ValueError):
+        b.before.trigger()
+
+    root, = tracer.spans
+    assert 'boom' in root.error
+    assert 'boom' in root.children[0].error
+
+
+def test_json_lines_export():
+    out = io.StringIO()
+    tracing.enable(Tracer(exporter=JsonLinesExporter(out)))
+
+    b1 = cascade()
+    b1.before.trigger()
+    b1.before.trigger()
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2
+    tree = json.loads(lines[0])
+    assert tree['kind'] == 'trigger'
+    assert tree['children'][0]['name'] == 'handle_b1'
+    assert tree['children'][0]['children'][0]['children'][0]['name'] == 'handle_b2'
+
+
+def test_chrome_trace_export():
+    out = io.StringIO()
+    exporter = ChromeTraceExporter(out)
+    tracing.enable(Tracer(exporter=exporter))
+
+    cascade().before.trigger()
+    exporter.close()
+
+    events = json.loads(out.getvalue())
+    assert [e['name'] for e in events] == [
+        '<InstanceHook Base.before>', 'handle_b1', '<InstanceHook Base.before>', 'handle_b2',
+    ]
+    assert all(e['ph'] == 'X' for e in events)
+    assert events[0]['dur'] >= events[1]['dur']
@@ -0,0 +1,115 @@
+import gc
+import logging
+import time
+
+from hookery import ClassHook, Hook, hookable
+from hookery.watchdog import Watchdog
+
+
+def slow(duration=0.02):
+    time.sleep(duration)
+    return 'slow'
+
+
+def test_slow_handler_is_reported_to_hook_watchdog():
+    violations = []
+    hook = Hook('before', latency_budget=0.01, watchdog=Watchdog(on_violation=violations.append))
+    hook(lambda: 'fast')
+    handler = hook(slow)
+
+    assert hook.trigger() == ['fast', 'slow']
+
+    assert len(violations) == 1
+    violation, = violations
+    assert violation.hook is hook
+    assert violation.handler is handler
+    assert violation.handler_name == 'slow'
+    assert violation.hook_name == 'before'
+    assert violation.subject is hook.subject
+    assert violation.duration >= 0.02
+    assert violation.budget == 0.01
+    assert hook.watchdog.violations[handler] == 1
+
+
+def test_violation_counts_do_not_keep_handlers_alive():
+    watchdog = Watchdog(on_violation=lambda slow_handler: None)
+    hook = Hook(latency_budget=0.001, watchdog=watchdog)
+    handler = hook(slow)
+
+    hook.trigger()
+    assert len(watchdog.violations) == 1
+
+    hook.unregister_handler(handler)
+    del handler
+    gc.collect()
+    assert len(watchdog.violations) == 0
+
+
+def test_handler_latency_budget_overrides_hook_budget():
+    violations = []
+    hook = Hook(latency_budget=0.001, watchdog=Watchdog(on_violation=violations.append))
+    hook.register_handler(slow, latency_budget=1)
+    handler = hook.register_handler(lambda: slow(0.01), latency_budget=0.005)
+
+    hook.trigger()
+    assert [v.handler for v in violations] == [handler]
+
+
+def test_hooks_without_budget_are_not_measured():
+    violations = []
+    hook = Hook(watchdog=Watchdog(on_violation=violations.append))
+    hook(slow)
+    hook.trigger()
+    assert violations == []
+
+
+def test_default_watchdog_logs_warning(caplog):
+    hook = Hook(latency_budget=0.001)
+    hook(slow)
+    with caplog.at_level(logging.WARNING, logger='hookery'):
+        hook.trigger()
+    assert 'slow' in caplog.text
+    assert 'latency budget' in caplog.text
+
+
+def test_slow_handler_on_shared_class_hook_is_muted_after_repeated_violations():
+    violations = []
+    watchdog = Watchdog(on_violation=violations.append, mute_after=2)
+
+    @hookable
+    class Base:
+        before = ClassHook(latency_budget=0.01, watchdog=watchdog)
+
+        @before
+        def fast(cls):
+            return 'fast'
+
+    class Derived(Base):
+        @Base.before
+        def slow_in_subclass(cls):
+            return slow()
+
+    assert Derived.before.latency_budget == 0.01
+
+    assert Derived.before.trigger() == ['fast', 'slow']
+    assert Derived.before.trigger() == ['fast', 'slow']
+    assert Derived.before.trigger() == ['fast']
+    assert len(violations) == 2
+    assert {v.subject for v in violations} == {Derived}
+
+    handler = violations[0].handler
+    assert handler.muted
+    handler.muted = False
+    assert Derived.before.trigger() == ['fast', 'slow']
+
+
+def test_muted_handlers_are_skipped_by_single_handler_and_around_hooks():
+    single = Hook(single_handler=True)
+    single(lambda: 1)
+    single(lambda: 2).muted = True
+    assert single.trigger() == 1
+
+    around = Hook(around=True)
+    around(lambda call_next: 'outer({})'.format(call_next())).muted = True
+    around(lambda: 'inner')
+    assert around.trigger() == 'inner'